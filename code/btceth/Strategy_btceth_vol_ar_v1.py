@@ -1,12 +1,67 @@
 from math import sqrt
-from univ3api.simulation import PoolSimiulation, PositionInstance, PoolFee
+from univ3api.simulation import PoolSimiulation, PositionInstance, PoolFee, BacktestConfig, SimulationReport, run_backtests
 import univ3api.utils as utils
 import numpy as np
 from datetime import datetime
-import time
+import logging
+import pandas as pd
+from typing import Dict, List, Optional
+
+
+def cal_signals(time_data: pd.DataFrame) -> pd.DataFrame:
+    """Precompute the open/close gates used by HoldStrategy.on_time over the whole timeline.
+
+    :param time_data: timeseries data parsed into HoldStrategy.run
+    :type time_data: pd.DataFrame
+    :return: time_data with boolean columns openShort, openLong, closeLong and closeShort
+    :rtype: pd.DataFrame
+    """
+    close_lower_ma = time_data['CloseLowerMA']
+    sma_lower_lma = time_data['SmaLowerLma']
+    vol_lower = time_data['VolLowerBelowmaQuantile50']
+    vol_higher = time_data['VolHigherOvermaQuantile50Twosigma']
+    revoke_pos = time_data['revoke_pos']
+    ar_low = (time_data['arRollNorm'] < 5).to_numpy()
+    ar_high = (time_data['arRollNorm'] >= 5).to_numpy()
+
+    below_ma = ((close_lower_ma == True) & (sma_lower_lma == True) & (vol_lower == True)).to_numpy()
+    over_ma = ((close_lower_ma == False) & (vol_higher == False)).to_numpy()
+    return time_data.assign(
+        openShort=below_ma & ar_low,
+        openLong=over_ma & ar_low,
+        closeLong=~(over_ma | (revoke_pos == False).to_numpy()) | ar_high,
+        closeShort=~below_ma | ar_high,
+    )
+
+
+# the only columns HoldStrategy.on_time reads, every bar is turned into a dict of these
+BAR_COLUMNS = [
+    'timestamp', 'price', 'tick',
+    'openShort', 'openLong', 'closeLong', 'closeShort',
+    'shortUpperTick', 'shortLowerTick', 'longUpperTick', 'longLowerTick',
+    'CloseLowerMA', 'SmaLowerLma', 'VolLowerBelowmaQuantile50', 'VolHigherOvermaQuantile50Twosigma',
+    'arRollNorm',
+]
+
+
+log = logging.getLogger(__name__)
+
 
 class HoldStrategy(PoolSimiulation):
-    def __init__(self, amount0: int, amount1: int, decimal0: int, decimal1: int, fee: PoolFee, price_reverse: bool=False) -> None:
+    def __init__(
+        self, amount0: int, amount1: int, decimal0: int, decimal1: int, fee: PoolFee, price_reverse: bool=False,
+        upper_band: float=0.5, lower_band: float=0.5, swap_pct: float=0.55, day_length: int=30
+        ) -> None:
+        """
+        :param upper_band: short position upper price = price*(1 + upper_band), defaults to 0.5
+        :type upper_band: float, optional
+        :param lower_band: short position lower price = price*(1 - lower_band), defaults to 0.5
+        :type lower_band: float, optional
+        :param swap_pct: percentage of token0 swapped to token1 before minting, defaults to 0.55
+        :type swap_pct: float, optional
+        :param day_length: days of volatility scaling the long position band, defaults to 30
+        :type day_length: int, optional
+        """
         super().__init__(amount0, amount1, decimal0, decimal1, fee, price_reverse)
         self.position_id = None
         self.increased = False
@@ -14,13 +69,73 @@ class HoldStrategy(PoolSimiulation):
         self.mint_timestamp = 0
         self.factor0 = 10**self.decimal0
         self.factor1 = 10**self.decimal1
+        self._inv_factor0 = 1.0/self.factor0
+        self._inv_factor1 = 1.0/self.factor1
         self.pc = utils.PriceConverter(8, 18)
         self.open_pos_times = 0
         self.long_pos = False
         self.short_pos = False
-        self.day_length = 30
-        self.openPosTimeList = [1622000000]
+        self.upper_band = upper_band
+        self.lower_band = lower_band
+        self.swap_pct = swap_pct
+        self.day_length = day_length
+        self.long_band = 2*0.020494*sqrt(self.day_length)
+        self.last_open_ts = 1622000000
         
+    def run(self, swaps: pd.DataFrame, time_data: pd.DataFrame):
+        # signals do not depend on the strategy params, run_sweep computes them once for all variants
+        if 'openShort' not in time_data.columns:
+            time_data = cal_signals(time_data)
+        super().run(swaps, self.cal_ticks(time_data)[BAR_COLUMNS])
+
+    def cal_ticks(self, time_data: pd.DataFrame) -> pd.DataFrame:
+        """Precompute current tick and the spacing-rounded band ticks of both open branches.
+
+        :param time_data: timeseries data parsed into self.run
+        :type time_data: pd.DataFrame
+        :return: time_data with tick columns tick, shortUpperTick, shortLowerTick, longUpperTick and longLowerTick
+        :rtype: pd.DataFrame
+        """
+        price = time_data['price'].to_numpy(dtype=np.float64)
+
+        def price_to_tick(p):
+            return (np.log(self.pc.price_to_dex(p)) / utils.LN_10001).astype(np.int64)
+
+        long_lower = price*(1 - self.long_band)
+        short_upper_tick, short_lower_tick = self.cal_tick(price_to_tick(price*(1 + self.upper_band)), price_to_tick(price*(1 - self.lower_band)))
+        long_upper_tick, long_lower_tick = self.cal_tick(price_to_tick(price/long_lower*price), price_to_tick(long_lower))
+
+        return time_data.assign(
+            tick=price_to_tick(price),
+            shortUpperTick=short_upper_tick,
+            shortLowerTick=short_lower_tick,
+            longUpperTick=long_upper_tick,
+            longLowerTick=long_lower_tick,
+        )
+
+    def plain_amounts(self, amt0, amt1):
+        return amt0*self._inv_factor0, amt1*self._inv_factor1
+
+    def close_position(self, swap_pct: float=0.95):
+        """Decrease and collect the whole position, then swap token1 back to token0 when more than 0.05 is left.
+
+        :param swap_pct: percentage of token1 to swap back, defaults to 0.95
+        :type swap_pct: float, optional
+        """
+        position, amt0, amt1 = self.decrease_liquidity(self.position_id, pct=1)
+        log.info("【RealWorldTime】:%s,Timestamp: %s, Blocknumber: %s", utils.LazyTimestamp(self.timestamp), self.timestamp, self.block_number)
+        log.info("Decreased position： %s", position)
+        log.info("【Decreased amount】: token0=%s, token1=%s", *self.plain_amounts(amt0, amt1))
+        log.info("Wallet amount: token0=%s, token1=%s", *self.plain_amounts(self.amount0, self.amount1))
+        self.collect(self.position_id)
+        self.position_id = None
+        self.increased = False
+
+        token1 = self.amount1*self._inv_factor1
+        if token1 > 0.05: #如果钱包里的eth多于0.05，则将eth全都换成btc
+            self.swap(1, pct=swap_pct)
+        log.info("撤池后经转换 Wallet amount: token0=%s, token1=%s", *self.plain_amounts(self.amount0, self.amount1))
+
     def price_in_range(self, price):
         return self.lower_price < price < self.upper_price
 
@@ -30,6 +145,11 @@ class HoldStrategy(PoolSimiulation):
         return upper_tick, lower_tick
     
     def on_time(self, data: dict):
+        openShort = data['openShort']
+        openLong = data['openLong']
+        # nothing to open and nothing to close: skip the bar
+        if not (openShort or openLong or self.position_id):
+            return
         price = data["price"]
         ts = data["timestamp"]
         # trend = data['trend']
@@ -37,205 +157,144 @@ class HoldStrategy(PoolSimiulation):
         VolLowerBelowmaQuantile50 = data['VolLowerBelowmaQuantile50']
         CloseLowerMA = data['CloseLowerMA']
         VolHigherOvermaQuantile50Twosigma = data['VolHigherOvermaQuantile50Twosigma']
-        revoke_pos = data['revoke_pos']
         arRollNorm = data['arRollNorm']
-        openTimeGap = self.timestamp - self.openPosTimeList[-1]
+        openTimeGap = self.timestamp - self.last_open_ts
         '''
         建池条件检查
         '''
-        if CloseLowerMA==True and SmaLowerLma==True and VolLowerBelowmaQuantile50==True and arRollNorm<5 and openTimeGap>=43200 and not self.position_id:
+        if openShort and openTimeGap>=43200 and not self.position_id:
         # if CloseLowerMA==1 and SmaLowerLma==1  and not self.position_id:
             self.open_pos_times += 1
             self.short_pos = True
-            print(f'**********************【Price Below MA】【创建Short Vol池子】【第{self.open_pos_times}次建池】***********************************')
+            log.info('**********************【Price Below MA】【创建Short Vol池子】【第%s次建池】***********************************', self.open_pos_times)
             # self.upper_price = price*(1 + 4*0.026427*sqrt(self.day_length))
             # self.lower_price = price*(1 - 4*0.026427*sqrt(self.day_length))
-            self.upper_price = price*(1 + 0.5)
-            self.lower_price = price*(1 - 0.5)
-            self.swap(0, pct=0.55)   #部分btc换成eth
-            print('转换后钱包中余额','amount0: ', self.amount0, 'amount1: ',self.amount1)
-            print("price: ", price)
-            tick = self.pc.price_to_tick(price)
-            upperTick = self.pc.price_to_tick(self.upper_price)
-            lowerTick = self.pc.price_to_tick(self.lower_price)
+            self.upper_price = price*(1 + self.upper_band)
+            self.lower_price = price*(1 - self.lower_band)
+            self.swap(0, pct=self.swap_pct)   #部分btc换成eth
+            log.info('转换后钱包中余额 amount0: %s amount1: %s', self.amount0, self.amount1)
+            log.info("price: %s", price)
+            tick = int(data['tick'])
             # (1)
-            print('$$$$$$$【Upper Price】:', self.upper_price)
-            print('$$$$$$$【Lower Price】:', self.lower_price)
+            log.info('$$$$$$$【Upper Price】: %s', self.upper_price)
+            log.info('$$$$$$$【Lower Price】: %s', self.lower_price)
             
             if self.price_in_range(price):
-                upper_tick, lower_tick = self.cal_tick(upperTick, lowerTick)
+                upper_tick, lower_tick = int(data['shortUpperTick']), int(data['shortLowerTick'])
                 # cal L
-                L, amount0, amount1 = utils.PositionUtil.cal_liquidity(
-                                    cprice=1.0001**tick,
-                                    upper=1.0001**upper_tick,
-                                    lower=1.0001**lower_tick,
-                                    amt0=int(self.amount0),
-                                    amt1=None
-                                )
+                L, t0, t1 = utils.open_position_amounts(tick, lower_tick, upper_tick, int(self.amount0))
                 # print('######:', L, amount0, amount1)
-                print('######【L】:{}【BTC】:{}【ETH】:{}'.format( L, amount0, amount1))
-                pu = utils.PositionUtil(
-                                        L,
-                                        tick_lower=lower_tick,
-                                        tick_upper=upper_tick,
-                                        decimal0=6, ########注意币种转换区分########
-                                        decimal1=18 ########注意币种转换区分########
-                                        )
-                t0 = pu.amount0_t(tick)
-                t1 = pu.amount1_t(tick)
+                log.info('######【L】:%s【BTC】:%s【ETH】:%s', L, t0, t1)
                 # self.amount0 = t0
                 # self.amount1 = t1
 
-                print('将要投入池子的数量','amount_t0:', t0, 'amount_t1:', t1)
+                log.info('将要投入池子的数量 amount_t0: %s amount_t1: %s', t0, t1)
                 # print('$$$$$$$$$$$$$$$$', self.amount1-t1)
                 position, amt0, amt1 = self.mint(
                     lower_tick, upper_tick,
                     int(t0), int(t1)
                 )
                 self.position_id = position.token_id
-                time_to_print = time.localtime(self.timestamp)
-                time_to_print = time.strftime('%Y-%m-%d %H:%M:%S', time_to_print)
-                print(f"【RealWorldTime】:{time_to_print}, Timestamp: {self.timestamp}, Blocknumber: {self.block_number}")
-                print(f"Mint position： {position}")
-                print(f"【Mint amount】: token0={amt0/self.factor0}, token1={amt1/self.factor1}")
-                print(f"Wallet amount: token0={self.amount0/self.factor0}, token1={self.amount1/self.factor1}")
+                log.info("【RealWorldTime】:%s, Timestamp: %s, Blocknumber: %s", utils.LazyTimestamp(self.timestamp), self.timestamp, self.block_number)
+                log.info("Mint position： %s", position)
+                log.info("【Mint amount】: token0=%s, token1=%s", *self.plain_amounts(amt0, amt1))
+                log.info("Wallet amount: token0=%s, token1=%s", *self.plain_amounts(self.amount0, self.amount1))
                 self.mint_price = price
                 self.mint_timestamp = ts
-                self.openPosTimeList.append(self.timestamp)
+                self.last_open_ts = self.timestamp
                 return
 
 
-        elif CloseLowerMA==False and VolHigherOvermaQuantile50Twosigma==False and arRollNorm<5 and openTimeGap>=43200 and not self.position_id:
+        elif openLong and openTimeGap>=43200 and not self.position_id:
             self.open_pos_times += 1
             self.long_pos = True
-            print(f'**********************【Price Over MA】【创建Long Vol池子】【第{self.open_pos_times}次建池】***********************************')
+            log.info('**********************【Price Over MA】【创建Long Vol池子】【第%s次建池】***********************************', self.open_pos_times)
             
             # self.lower_price = price*(1 - 4*0.020494*sqrt(self.day_length))
-            self.lower_price = price*(1 - 2*0.020494*sqrt(self.day_length))
+            self.lower_price = price*(1 - self.long_band)
             self.upper_price = price/self.lower_price*price 
-            self.swap(0, pct=0.55)   #部分btc换成eth
-            print('转换后钱包中余额','amount0: ', self.amount0, 'amount1: ',self.amount1)
-            print("price: ", price)
-            tick = self.pc.price_to_tick(price)
-            upperTick = self.pc.price_to_tick(self.upper_price)
-            lowerTick = self.pc.price_to_tick(self.lower_price)
+            self.swap(0, pct=self.swap_pct)   #部分btc换成eth
+            log.info('转换后钱包中余额 amount0: %s amount1: %s', self.amount0, self.amount1)
+            log.info("price: %s", price)
+            tick = int(data['tick'])
             # (1)
-            print('$$$$$$$【Upper Price】:', self.upper_price)
-            print('$$$$$$$【Lower Price】:', self.lower_price)
+            log.info('$$$$$$$【Upper Price】: %s', self.upper_price)
+            log.info('$$$$$$$【Lower Price】: %s', self.lower_price)
             
             if self.price_in_range(price):
-                upper_tick, lower_tick = self.cal_tick(upperTick, lowerTick)
+                upper_tick, lower_tick = int(data['longUpperTick']), int(data['longLowerTick'])
                 # cal L
-                L, amount0, amount1 = utils.PositionUtil.cal_liquidity(
-                                    cprice=1.0001**tick,
-                                    upper=1.0001**upper_tick,
-                                    lower=1.0001**lower_tick,
-                                    amt0=int(self.amount0),
-                                    amt1=None
-                                )
+                L, t0, t1 = utils.open_position_amounts(tick, lower_tick, upper_tick, int(self.amount0))
                 # print('######:', L, amount0, amount1)
-                print('######【L】:{}【BTC】:{}【ETH】:{}'.format( L, amount0, amount1))
-                pu = utils.PositionUtil(
-                                        L,
-                                        tick_lower=lower_tick,
-                                        tick_upper=upper_tick,
-                                        decimal0=6, ########注意币种转换区分########
-                                        decimal1=18 ########注意币种转换区分########
-                                        )
-                t0 = pu.amount0_t(tick)
-                t1 = pu.amount1_t(tick)
+                log.info('######【L】:%s【BTC】:%s【ETH】:%s', L, t0, t1)
                 # self.amount0 = t0
                 # self.amount1 = t1
 
-                print('将要投入池子的数量','amount_t0:', t0, 'amount_t1:', t1)
+                log.info('将要投入池子的数量 amount_t0: %s amount_t1: %s', t0, t1)
                 # print('$$$$$$$$$$$$$$$$', self.amount1-t1)
                 position, amt0, amt1 = self.mint(
                     lower_tick, upper_tick,
                     int(t0), int(t1)
                 )
                 self.position_id = position.token_id
-                time_to_print = time.localtime(self.timestamp)
-                time_to_print = time.strftime('%Y-%m-%d %H:%M:%S', time_to_print) #把struct time转str
-                print(f"【RealWorldTime】:{time_to_print}, Timestamp: {self.timestamp}, Blocknumber: {self.block_number}")
-                print(f"Mint position： {position}")
-                print(f"【Mint amount】: token0={amt0/self.factor0}, token1={amt1/self.factor1}")
-                print(f"Wallet amount: token0={self.amount0/self.factor0}, token1={self.amount1/self.factor1}")
+                log.info("【RealWorldTime】:%s, Timestamp: %s, Blocknumber: %s", utils.LazyTimestamp(self.timestamp), self.timestamp, self.block_number)
+                log.info("Mint position： %s", position)
+                log.info("【Mint amount】: token0=%s, token1=%s", *self.plain_amounts(amt0, amt1))
+                log.info("Wallet amount: token0=%s, token1=%s", *self.plain_amounts(self.amount0, self.amount1))
                 self.mint_price = price
                 self.mint_timestamp = ts
-                self.openPosTimeList.append(self.timestamp)
+                self.last_open_ts = self.timestamp
                 return
         '''
         撤池条件检查
         '''
-        if (not( CloseLowerMA==False and VolHigherOvermaQuantile50Twosigma==False or revoke_pos==False) or arRollNorm>=5) and self.long_pos==True :
+        if data['closeLong'] and self.long_pos==True :
             # if self.position_id and not self.price_in_range(price):
-            print('******************************************【撤销池子】【原因:OverMA与VolHigherQuantile50TwoSigma条件不满足】****************************')
-            print(f'CloseLowerMA: {CloseLowerMA}, VolHigherQuantile50TwoSigma: {VolHigherOvermaQuantile50Twosigma},arRollNorm:{arRollNorm}')
-            print(f"Price({price}) out of range({self.lower_price}, {self.upper_price})")
-            position, amt0, amt1 = self.decrease_liquidity(self.position_id, pct=1)
-
+            log.info('******************************************【撤销池子】【原因:OverMA与VolHigherQuantile50TwoSigma条件不满足】****************************')
+            log.info('CloseLowerMA: %s, VolHigherQuantile50TwoSigma: %s,arRollNorm:%s', CloseLowerMA, VolHigherOvermaQuantile50Twosigma, arRollNorm)
+            log.info("Price(%s) out of range(%s, %s)", price, self.lower_price, self.upper_price)
             # self.short_pos =False
             self.long_pos = False
-            time_to_print = time.localtime(self.timestamp)
-            time_to_print = time.strftime('%Y-%m-%d %H:%M:%S', time_to_print)
-            print(f"【RealWorldTime】:{time_to_print},Timestamp: {self.timestamp}, Blocknumber: {self.block_number}")
-            print(f"Decreased position： {position}")
-            print(f"【Decreased amount】: token0={amt0/self.factor0}, token1={amt1/self.factor1}")
-            print(f"Wallet amount: token0={self.amount0/self.factor0}, token1={self.amount1/self.factor1}")
-            self.collect(self.position_id)
-            self.position_id = None
-            self.increased = False
-
-            token1 = self.amount1/self.factor1
-            if token1 > 0.05: #如果钱包里的eth多于0.05，则将eth全都换成btc
-                self.swap(1,pct=0.95)
-            print(f"撤池后经转换 Wallet amount: token0={self.amount0/self.factor0}, token1={self.amount1/self.factor1}")
+            self.close_position()
             return
-        elif  (not(CloseLowerMA==True and SmaLowerLma==True and VolLowerBelowmaQuantile50==True) or arRollNorm>=5) and self.short_pos==True:
+        elif data['closeShort'] and self.short_pos==True:
         # elif  not( SmaLowerLma==1) and self.short_pos==True:
-            print('******************************************【撤销池子】【原因:BelowMA与SmaLowerLma与VolLowerQuantile75条件不满足】**********************')
-            print(f'CloseLowerMA: {CloseLowerMA}, SmaLowerLma: {SmaLowerLma}, VolLowerQuantile75: {VolLowerBelowmaQuantile50},arRollNorm:{arRollNorm}')
-            print(f"Price({price}) out of range({self.lower_price}, {self.upper_price})")
-            position, amt0, amt1 = self.decrease_liquidity(self.position_id, pct=1)
-
+            log.info('******************************************【撤销池子】【原因:BelowMA与SmaLowerLma与VolLowerQuantile75条件不满足】**********************')
+            log.info('CloseLowerMA: %s, SmaLowerLma: %s, VolLowerQuantile75: %s,arRollNorm:%s', CloseLowerMA, SmaLowerLma, VolLowerBelowmaQuantile50, arRollNorm)
+            log.info("Price(%s) out of range(%s, %s)", price, self.lower_price, self.upper_price)
             self.short_pos =False
             # self.long_pos = False
-            time_to_print = time.localtime(self.timestamp)
-            time_to_print = time.strftime('%Y-%m-%d %H:%M:%S', time_to_print)
-            print(f"【RealWorldTime】:{time_to_print},Timestamp: {self.timestamp}, Blocknumber: {self.block_number}")
-            print(f"Decreased position： {position}")
-            print(f"【Decreased amount】: token0={amt0/self.factor0}, token1={amt1/self.factor1}")
-            print(f"Wallet amount: token0={self.amount0/self.factor0}, token1={self.amount1/self.factor1}")
-            self.collect(self.position_id)
-            self.position_id = None
-            self.increased = False
-
-            token1 = self.amount1/self.factor1
-            if token1 > 0.05: #如果钱包里的eth多于0.05，则将eth全都换成btc
-                self.swap(1,pct=0.99999)
-            print(f"撤池后经转换 Wallet amount: token0={self.amount0/self.factor0}, token1={self.amount1/self.factor1}")
+            self.close_position(swap_pct=0.99999)
             return
          
         if self.position_id and not self.price_in_range(price):
-            print('******************************************【撤销池子】【原因:超边撤池】******************************************')
-            print(f"Price({price}) out of range({self.lower_price}, {self.upper_price})")
-            position, amt0, amt1 = self.decrease_liquidity(self.position_id, pct=1)
-
+            log.info('******************************************【撤销池子】【原因:超边撤池】******************************************')
+            log.info("Price(%s) out of range(%s, %s)", price, self.lower_price, self.upper_price)
             self.short_pos =False
             self.long_pos = False
-            time_to_print = time.localtime(self.timestamp)
-            time_to_print = time.strftime('%Y-%m-%d %H:%M:%S', time_to_print)
-            print(f"【RealWorldTime】:{time_to_print},Timestamp: {self.timestamp}, Blocknumber: {self.block_number}")
-            print(f"Decreased position： {position}")
-            print(f"【Decreased amount】: token0={amt0/self.factor0}, token1={amt1/self.factor1}")
-            print(f"Wallet amount: token0={self.amount0/self.factor0}, token1={self.amount1/self.factor1}")
-            self.collect(self.position_id)
-            self.position_id = None
-            self.increased = False
-
-            token1 = self.amount1/self.factor1
-            if token1 > 0.05: #如果钱包里的eth多于0.05，则将eth全都换成btc
-                self.swap(1,pct=0.95)
-            print(f"撤池后经转换 Wallet amount: token0={self.amount0/self.factor0}, token1={self.amount1/self.factor1}")
+            self.close_position()
             return
-                
\ No newline at end of file
+
+
+def run_sweep(
+    swaps: pd.DataFrame, time_data: pd.DataFrame, param_grid: List[Dict],
+    amount0: int, amount1: int, decimal0: int, decimal1: int, fee: PoolFee, price_reverse: bool=False,
+    max_workers: Optional[int]=None
+    ) -> List[SimulationReport]:
+    """Backtest one HoldStrategy per param set of param_grid over the same data.
+
+    Signals are computed once and shared by every variant, the variants run in parallel through run_backtests.
+
+    >>> grid = [{"upper_band": b, "lower_band": b, "swap_pct": 0.55, "day_length": 30} for b in (0.3, 0.5)]
+        reports = run_sweep(swapdata, pricedata_res, grid, init_amount0, init_amount1, decimal0, decimal1, PoolFee.low, True)
+
+    :param param_grid: HoldStrategy keyword params (upper_band, lower_band, swap_pct, day_length) of each variant
+    :type param_grid: List[Dict]
+    :param max_workers: number of worker processes, defaults to os.cpu_count()
+    :type max_workers: Optional[int], optional
+    :return: reports in the same order as param_grid
+    :rtype: List[SimulationReport]
+    """
+    args = (amount0, amount1, decimal0, decimal1, fee, price_reverse)
+    configs = [BacktestConfig(HoldStrategy, args, params) for params in param_grid]
+    return run_backtests(configs, swaps, cal_signals(time_data), max_workers)
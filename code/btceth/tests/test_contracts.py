@@ -0,0 +1,89 @@
+import importlib
+import importlib.util
+import unittest
+from unittest import mock
+
+
+@unittest.skipUnless(importlib.util.find_spec("web3"), "web3 is not installed")
+class ImportTest(unittest.TestCase):
+
+    def test_import_contract_wrappers(self):
+        for name in (
+            "base", "cache", "erc20", "multicall", "provider", "position_manager", "core.pool", "core.factory",
+        ):
+            with self.subTest(module=name):
+                importlib.import_module(f"univ3api.contracts.{name}")
+
+
+
+@unittest.skipUnless(importlib.util.find_spec("web3"), "web3 is not installed")
+class CalLiquidityCoreTest(unittest.TestCase):
+
+    def test_compiled_matches_python(self):
+        from univ3api.contracts.position_manager import _cal_liquidity_core
+
+        py_func = getattr(_cal_liquidity_core, "py_func", _cal_liquidity_core)
+        for args in [(1.0, 2.0, 0.5, 1e20, 0.0), (1.0, 2.0, 0.5, 0.0, 3e21), (0.1, 2.0, 0.5, 1e20, 0.0), (4.0, 2.0, 0.5, 0.0, 3e21)]:
+            with self.subTest(args=args):
+                self.assertEqual(_cal_liquidity_core(*args), py_func(*args))
+
+
+@unittest.skipUnless(importlib.util.find_spec("web3"), "web3 is not installed")
+class PositionTest(unittest.TestCase):
+
+    def test_dict_compatible(self):
+        from univ3api.contracts.position_manager import Position
+
+        position = Position._make(range(12))
+        self.assertIsInstance(position, Position)
+        self.assertEqual(position["liquidity"], position.liquidity)
+        self.assertEqual(position[7], 7)
+        self.assertEqual(position[5:8], (5, 6, 7))
+        self.assertEqual(dict(position)["tokensOwed1"], 11)
+        self.assertEqual(list(dict(position)), list(Position._fields))
+        with self.assertRaises(KeyError):
+            position["balance"]
+
+
+@unittest.skipUnless(importlib.util.find_spec("web3"), "web3 is not installed")
+class SyncSendTest(unittest.TestCase):
+
+    def setUp(self):
+        from univ3api.contracts.base import BaseLocalContractAPI
+
+        self.api = mock.Mock()
+        self.api.eth.chain_id = 1
+        self.api.eth.get_transaction_count.return_value = 7
+        self.account = mock.Mock(address="0x0000000000000000000000000000000000000001")
+        self.account.sign_transaction.return_value = mock.Mock(rawTransaction=b"\x01", hash=b"\x02" * 32)
+        self.function = mock.Mock()
+        self.function.buildTransaction.return_value = {}
+        self.wrapper = BaseLocalContractAPI(self.api, mock.Mock(), self.account)
+        self.wrapper.reset_nonce()
+
+    def tearDown(self):
+        self.wrapper.reset_nonce()
+
+    def test_opt_in(self):
+        self.wrapper.send_transaction(self.function)
+        self.api.provider.make_request.assert_not_called()
+        self.api.eth.send_raw_transaction.assert_called_once_with(b"\x01")
+
+    def test_timeout_waits_for_the_sent_transaction(self):
+        self.wrapper.sync_send = True
+        self.api.provider.make_request.return_value = {"error": {"code": 4, "message": "timeout"}}
+        self.wrapper.send_transaction(self.function)
+        self.api.eth.send_raw_transaction.assert_not_called()
+        self.api.eth.wait_for_transaction_receipt.assert_called_once_with(b"\x02" * 32)
+        # the nonce was used, the next transaction takes the following one
+        self.assertEqual(self.wrapper.next_nonce(), 8)
+
+    def test_method_not_found_falls_back(self):
+        self.wrapper.sync_send = True
+        self.api.provider.make_request.return_value = {"error": {"code": -32601, "message": "method not found"}}
+        self.wrapper.send_transaction(self.function)
+        self.api.eth.send_raw_transaction.assert_called_once_with(b"\x01")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,54 @@
+"""Run from code/btceth: python -m unittest discover -s tests -t ."""
+import unittest
+
+import pandas as pd
+
+from univ3api.contracts.enums import PoolFee
+from univ3api.simulation import PoolSimiulation
+
+
+class RecordingSimulation(PoolSimiulation):
+
+    def __init__(self) -> None:
+        super().__init__(10**18, 10**18, 18, 18, PoolFee.medium)
+        self.events = []
+
+    def _on_swap(self, sqrt_price_x96, tick, block_number, liquidity, timestamp):
+        super()._on_swap(sqrt_price_x96, tick, block_number, liquidity, timestamp)
+        self.events.append(("swap", timestamp))
+
+    def on_time(self, data: dict):
+        self.events.append(("time", data["timestamp"]))
+
+
+def swaps_frame(timestamps):
+    return pd.DataFrame({
+        "blockNumber": list(range(len(timestamps))),
+        "tick": [0] * len(timestamps),
+        "timestamp": timestamps,
+        "sqrtPriceX96": [1 << 96] * len(timestamps),
+        "liquidity": [10**18] * len(timestamps),
+    })
+
+
+class RunOrderTest(unittest.TestCase):
+
+    def test_time_data_before_swaps_of_same_timestamp(self):
+        simulation = RecordingSimulation()
+        simulation.run(swaps_frame([100, 100, 200, 300]), pd.DataFrame({"timestamp": [100, 200, 250]}))
+        self.assertEqual(simulation.events, [
+            ("time", 100), ("swap", 100), ("swap", 100),
+            ("time", 200), ("swap", 200),
+            ("time", 250), ("swap", 300),
+        ])
+
+    def test_all_events_processed(self):
+        simulation = RecordingSimulation()
+        simulation.run(swaps_frame([100, 200]), pd.DataFrame({"timestamp": [150, 300, 400]}))
+        self.assertEqual(simulation.events, [
+            ("swap", 100), ("time", 150), ("swap", 200), ("time", 300), ("time", 400),
+        ])
+
+
+if __name__ == "__main__":
+    unittest.main()
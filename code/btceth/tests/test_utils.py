@@ -0,0 +1,87 @@
+import unittest
+
+import numpy as np
+
+from univ3api.utils import PositionUtil, _open_position_amounts_core, get_sqrt_ratio_at_tick, open_position_amounts
+
+
+class TickMathTest(unittest.TestCase):
+
+    def test_integral_float_tick(self):
+        self.assertEqual(get_sqrt_ratio_at_tick(195060.0), get_sqrt_ratio_at_tick(195060))
+        position = PositionUtil(10**18, 195060.0, 195120.0)
+        self.assertEqual(position.amount0_t(195090), PositionUtil(10**18, 195060, 195120).amount0_t(195090))
+
+    def test_fractional_tick(self):
+        with self.assertRaises(ValueError):
+            get_sqrt_ratio_at_tick(195060.5)
+
+
+class MintByPriceTest(unittest.TestCase):
+
+    def test_usdc_weth_position(self):
+        # token0 USDC (6 decimals), token1 WETH (18 decimals), prices in USDC per WETH
+        position = PositionUtil.mint_by_price(3000, 2500, 3500, 3000, 1, 6, 18, reverted=True)
+        self.assertEqual(position.tick_lower % 60, 0)
+        self.assertEqual(position.tick_upper % 60, 0)
+        self.assertEqual((position.tick_lower, position.tick_upper), (194700, 198120))
+        qty0, qty1 = position.qty(3000, reverted=True)
+        # usdc is the binding side, the weth amount follows from the liquidity
+        self.assertAlmostEqual(qty0, 3000, places=3)
+        self.assertLess(qty1, 1)
+        self.assertGreater(qty1, 0)
+
+    def test_range_narrower_than_spacing(self):
+        position = PositionUtil.mint_by_price(3000, 2999.9, 3000.1, 3000, 1, 6, 18, reverted=True)
+        self.assertEqual(position.tick_upper - position.tick_lower, 60)
+        self.assertGreater(position.liquidity, 0)
+        qty0, qty1 = position.qty(3000, reverted=True)
+        # weth is the binding side here
+        self.assertAlmostEqual(qty1, 1)
+        self.assertLess(qty0, 3000)
+
+    def test_empty_range(self):
+        with self.assertRaises(ValueError):
+            PositionUtil.mint_by_price(1, 1, 1, 1, 1)
+
+    def test_tick_spacing(self):
+        # 0.05% pools use a tick spacing of 10
+        position = PositionUtil.mint_by_price(3000, 2500, 3500, 3000, 1, 6, 18, reverted=True, tick_spacing=10)
+        self.assertEqual((position.tick_lower, position.tick_upper), (194710, 198080))
+        with self.assertRaises(AssertionError):
+            PositionUtil(10**18, 194710, 198080)
+
+
+class OpenPositionAmountsTest(unittest.TestCase):
+
+    def test_compiled_matches_python_at_wei_sizes(self):
+        py_func = getattr(_open_position_amounts_core, "py_func", _open_position_amounts_core)
+        for tick, tick_lower, tick_upper, amount0 in [
+            (257400, 256800, 258000, 10**8),         # 1 BTC, ETH side beyond int64
+            (257400, 256800, 258000, 10**10),
+            (-195000, -195600, -194400, 3 * 10**21),  # 3000 ETH as token0
+            (256000, 256800, 258000, 10**8),         # below the range
+        ]:
+            with self.subTest(tick=tick, amount0=amount0):
+                expected = tuple(int(value) for value in py_func(tick, tick_lower, tick_upper, float(amount0)))
+                result = open_position_amounts(tick, tick_lower, tick_upper, amount0)
+                self.assertEqual(result, expected)
+                self.assertTrue(all(isinstance(value, int) and value >= 0 for value in result))
+
+    def test_token1_amount_beyond_int64(self):
+        _, _, amount1 = open_position_amounts(257400, 256800, 258000, 10**8)
+        self.assertGreater(amount1, 2**63)
+
+
+class QtyBatchTest(unittest.TestCase):
+
+    def test_matches_scalar_qty(self):
+        position = PositionUtil(10**18, 195060, 195120)
+        prices = np.array([1.0001**tick for tick in (195000, 195070, 195090, 195110, 195200)])
+        qty0, qty1 = position.qty_batch(prices)
+        self.assertEqual(qty0.tolist(), [position.qty0(price) for price in prices])
+        self.assertEqual(qty1.tolist(), [position.qty1(price) for price in prices])
+
+
+if __name__ == "__main__":
+    unittest.main()
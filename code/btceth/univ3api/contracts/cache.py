@@ -0,0 +1,79 @@
+"""Persistent cache of immutable on chain lookups (pool addresses, token decimals).
+
+Values are kept in memory for the process and in a shelve file, by default
+~/.cache/univ3api/pools.db. Set UNIV3API_CACHE to another path, or to an empty
+string to keep the cache in memory only.
+
+The shelve file is opened per call without any locking, it is meant for a
+single process. Give concurrent processes their own UNIV3API_CACHE path.
+"""
+import dbm
+import logging
+import os
+import shelve
+from typing import Any, Callable, Optional
+
+
+CACHE_ENV = "UNIV3API_CACHE"
+DEFAULT_CACHE_FILE = os.path.join(os.path.expanduser("~"), ".cache", "univ3api", "pools.db")
+
+# shared by every contract wrapper of the process
+_MEMORY = {}
+
+
+def cache_file() -> str:
+    return os.environ.get(CACHE_ENV, DEFAULT_CACHE_FILE)
+
+
+_MISSING = object()
+
+
+def peek(key: tuple, default=None):
+    """Cached value of key from memory or the cache file, default if never stored."""
+    if key in _MEMORY:
+        return _MEMORY[key]
+
+    path = cache_file()
+    if path:
+        try:
+            with shelve.open(path, "r") as db:
+                value = db.get(repr(key), _MISSING)
+        except dbm.error:
+            # no cache file yet
+            return default
+        if value is not _MISSING:
+            _MEMORY[key] = value
+            return value
+    return default
+
+
+def store(key: tuple, value):
+    _MEMORY[key] = value
+    path = cache_file()
+    if path:
+        try:
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+            with shelve.open(path) as db:
+                db[repr(key)] = value
+        except dbm.error as e:
+            logging.warning("can not write %s: %s", path, e)
+
+
+def cached_lookup(key: tuple, fetch: Callable[[], Any], keep: Optional[Callable[[Any], bool]]=None):
+    """Value of key from memory, then from the cache file, otherwise from fetch().
+
+    :param key: tuple of str/int identifying the value, e.g. ("decimals", chain_id, address)
+    :type key: tuple
+    :param fetch: called on a miss, usually an rpc call
+    :type fetch: Callable[[], Any]
+    :param keep: fetched values are only cached when keep(value) is true, defaults to None (always)
+    :type keep: Optional[Callable[[Any], bool]], optional
+    """
+    value = peek(key, _MISSING)
+    if value is not _MISSING:
+        return value
+
+    value = fetch()
+    if keep is None or keep(value):
+        store(key, value)
+    return value
@@ -0,0 +1,91 @@
+import os
+import json
+import weakref
+from typing import List
+from hexbytes.main import HexBytes
+from univ3api.contracts.base import BaseLocalContractAPI
+from web3 import Web3
+from web3.contract import ContractFunction
+from web3.exceptions import ContractLogicError
+from web3._utils.abi import get_abi_output_types, map_abi_data
+from web3._utils.normalizers import BASE_RETURN_NORMALIZERS
+import web3
+
+
+ABI_FILE = "Multicall3.json"
+CONTRACT_ADDRESS = "0xcA11bde05977b3631167028862bE2a173976CA11"
+
+
+def get_abi():
+    pwd, _ = os.path.split(__file__)
+    with open(os.path.join(pwd, ABI_FILE), "r") as f:
+        return json.load(f)["abi"]
+
+
+_ABI = get_abi()
+# whether Multicall3 is deployed on the chain of a Web3 instance, one eth_getCode per instance
+_DEPLOYED = weakref.WeakKeyDictionary()
+
+
+def decode_call_result(api: Web3, function: ContractFunction, data: bytes):
+    """Decode the raw return data of a bound contract call the way `function.call()` does.
+
+    :param api: Web3 object
+    :type api: Web3
+    :param function: bound contract call which produced data
+    :type function: ContractFunction
+    :param data: return data
+    :type data: bytes
+    """
+    output_types = get_abi_output_types(function.abi)
+    decoded = api.codec.decode_abi(output_types, data)
+    normalized = map_abi_data(BASE_RETURN_NORMALIZERS, output_types, decoded)
+    return normalized[0] if len(normalized) == 1 else normalized
+
+
+def encode_call(function: ContractFunction) -> bytes:
+    return HexBytes(function._encode_transaction_data())
+
+
+class Multicall3(BaseLocalContractAPI):
+
+    def __init__(self, api: Web3, account: web3.Account):
+        contract = api.eth.contract(CONTRACT_ADDRESS, abi=_ABI)
+        super().__init__(api, contract, account)
+
+    def aggregate(self, functions: List[ContractFunction], allow_failure: bool=False) -> list:
+        """Run several view calls in a single eth_call through aggregate3.
+
+        :param functions: bound contract calls, e.g. `pool.contract.functions.slot0()`
+        :type functions: List[ContractFunction]
+        :param allow_failure: if True a reverted call gives None instead of reverting the batch, defaults to False
+        :type allow_failure: bool, optional
+        :return: decoded results in the same order and shape as `function.call()`
+        :rtype: list
+        """
+        if not functions:
+            return []
+        if not self.deployed():
+            return [self._call(function, allow_failure) for function in functions]
+        calls = [(function.address, allow_failure, encode_call(function)) for function in functions]
+        results = self.contract.functions.aggregate3(calls).call()
+        return [
+            decode_call_result(self.api, function, data) if success else None
+            for function, (success, data) in zip(functions, results)
+        ]
+
+    def deployed(self) -> bool:
+        """True if the chain has Multicall3 at CONTRACT_ADDRESS, otherwise aggregate falls back to separate calls."""
+        deployed = _DEPLOYED.get(self.api)
+        if deployed is None:
+            deployed = _DEPLOYED[self.api] = len(self.api.eth.get_code(CONTRACT_ADDRESS)) > 0
+        return deployed
+
+    @staticmethod
+    def _call(function: ContractFunction, allow_failure: bool):
+        try:
+            return function.call()
+        except ContractLogicError:
+            if allow_failure:
+                return None
+            raise
@@ -1,12 +1,16 @@
-from datetime import datetime
 import math
+import os
+from concurrent.futures import ProcessPoolExecutor
 
+import numpy as np
 from numpy import blackman
-from .utils import PositionUtil
+from .utils import PositionUtil, tick_range_sqrt
 import pandas  as pd
-from typing import Dict, Iterable, Tuple, Union, List
-from .contracts.enums import PoolFee
+from dateutil.tz import tzlocal
+from typing import Dict, Iterable, Tuple, Union, List, Optional
+from .contracts.enums import PoolFee, TICK_SPACING
 from collections import namedtuple
+from functools import lru_cache
 
 
 V3FACTORY_CREATION_BLOCK = 12369621 
@@ -16,14 +20,16 @@ PositionBalanceLog = namedtuple("PositionBalanceLog",  ["block", "timestamp", "a
 WalletLog = namedtuple("WalletLog", ["block", "timestamp", "amount0", "amount1"])
 
 DataEvent = namedtuple("DataEvent", ["timestamp", "priority", "data"])
+BacktestConfig = namedtuple("BacktestConfig", ["strategy_cls", "args", "kwargs"])
 
 
 def position_curve(pu: PositionUtil, prices: pd.DataFrame):
     pair_price = prices["token0"]/prices["token1"]
+    # one vectorised pass over the whole column instead of a qty0/qty1 call per row
     positions = pd.DataFrame({
-        "position0": pair_price.apply(pu.qty0),
-        "position1": pair_price.apply(pu.qty1),
-    })
+        "position0": pu.qty0(pair_price.values),
+        "position1": pu.qty1(pair_price.values),
+    }, index=pair_price.index)
     positions["mkv0"] = positions["position0"] * prices["token0"]
     positions["mkv1"] = positions["position1"] * prices["token1"]
     positions["mkv"] = positions["mkv0"] + positions["mkv1"]
@@ -37,39 +43,61 @@ class PositionInstance(PositionUtil):
         tick_lower: int, tick_upper: int, 
         decimal0: int, decimal1: int, 
         fee_rate: int, token_id: int=0, price_reverse: bool=False) -> None:
-        super().__init__(liquidity, tick_lower, tick_upper, decimal0=decimal0, decimal1=decimal1, price_reverse=price_reverse)
+        super().__init__(
+            liquidity, tick_lower, tick_upper, decimal0=decimal0, decimal1=decimal1,
+            price_reverse=price_reverse, tick_spacing=TICK_SPACING[fee_rate]
+        )
         self.fee_rate = fee_rate
         self.fee0 = 0
         self.fee1 = 0
         self.token_id = token_id
-        self.balance: List[PositionBalanceLog] = []
-        self.history: List[LiquidityLog] = []
+        # logs kept column-wise like PoolSimiulation._wallet_columns
+        self._balance_columns: Tuple[list, ...] = tuple([] for _ in PositionBalanceLog._fields)
+        self._history_columns: Tuple[list, ...] = tuple([] for _ in LiquidityLog._fields)
+        # fees of swaps not logged yet, see PoolSimiulation log_stride
+        self._unlogged_fee0 = 0
+        self._unlogged_fee1 = 0
+
+    @property
+    def balance(self) -> List[PositionBalanceLog]:
+        return [PositionBalanceLog(*row) for row in zip(*self._balance_columns)]
+
+    @property
+    def history(self) -> List[LiquidityLog]:
+        return [LiquidityLog(*row) for row in zip(*self._history_columns)]
 
     def increase_liquidity(self, sqrt_price: float, amount0: int, amount1: int) -> Tuple[int, int, int]:
-        amt0 = self.amount0_psqrt(sqrt_price)
-        amt1 = self.amount1_psqrt(sqrt_price)
-        l, _, _ = self.cal_liquidity_sqrt(sqrt_price, self.low_price_sqrt, self.high_price_sqrt, amount0, amount1)
+        # amount*_psqrt before and after, with one range check
+        u0, u1 = self.unit_amounts(sqrt_price)
+        former = self.liquidity
+        l, _, _ = self.cal_liquidity_inst(sqrt_price, amount0, amount1)
         liquidity = self.liquidity + l
         self.update_liquidity(liquidity)
-        return l, self.amount0_psqrt(sqrt_price) - amt0, self.amount1_psqrt(sqrt_price) - amt1
+        return l, int(liquidity * u0) - int(former * u0), int(liquidity * u1) - int(former * u1)
 
     def decrease_liquidity(self, sqrt_price: float, liquidity: int=None, pct: float=1) -> Tuple[int, int, int]:
         assert liquidity or pct
         if not liquidity:
             assert 0 < pct <= 1
             liquidity = self.liquidity*pct  
-        a0, a1 = self.amount0_psqrt(sqrt_price), self.amount1_psqrt(sqrt_price)
+        u0, u1 = self.unit_amounts(sqrt_price)
+        former = self.liquidity
         self.update_liquidity(self.liquidity - liquidity)
-        return self.liquidity, a0-self.amount0_psqrt(sqrt_price), a1-self.amount1_psqrt(sqrt_price)
+        return self.liquidity, int(former * u0) - int(self.liquidity * u0), int(former * u1) - int(self.liquidity * u1)
+
+    def swap(self, from_sqrt_price: float, to_sqrt_price: float, to_amounts: Tuple[int, int]=None) -> Tuple[int, int]:
+        """Accrue the fee of a swap moving price from from_sqrt_price to to_sqrt_price.
 
-    def swap(self, from_sqrt_price: float, to_sqrt_price: float) -> Tuple[int, int]:
+        :param to_amounts: (amount0, amount1) at to_sqrt_price if already known, defaults to None
+        :type to_amounts: Tuple[int, int], optional
+        """
         if to_sqrt_price > from_sqrt_price:
-            amount1 = self.amount1_psqrt(to_sqrt_price) - self.amount1_psqrt(from_sqrt_price)
+            amount1 = (to_amounts[1] if to_amounts else self.amount1_psqrt(to_sqrt_price)) - self.amount1_psqrt(from_sqrt_price)
             fee1 = int(amount1*self.fee_rate/1000000)
             self.fee1 += fee1
             return 0, fee1
         else:
-            amount0 = self.amount0_psqrt(to_sqrt_price) - self.amount0_psqrt(from_sqrt_price)
+            amount0 = (to_amounts[0] if to_amounts else self.amount0_psqrt(to_sqrt_price)) - self.amount0_psqrt(from_sqrt_price)
             fee0 = int(amount0*self.fee_rate/1000000)
             self.fee0 += fee0
             return fee0, 0
@@ -83,31 +111,46 @@ class PositionInstance(PositionUtil):
         return f0, f1
     
     def log_history(self, block: int, timestamp: int):
-        self.history.append(LiquidityLog(block, timestamp, self.liquidity))
-    
-    def log_balance(self, block: int, timestamp: int, sqrt_price: float, fee0: int, fee1: int):
-        self.balance.append(
-            PositionBalanceLog(
-                block, 
-                timestamp,
-                self.amount0_psqrt(sqrt_price),
-                self.amount1_psqrt(sqrt_price),
-                fee0,
-                fee1 
-            )
-        )
+        blocks, timestamps, liquidities = self._history_columns
+        blocks.append(block)
+        timestamps.append(timestamp)
+        liquidities.append(self.liquidity)
+
+    def defer_fees(self, fee0: int, fee1: int):
+        """Keep fees of an unlogged swap for the next log_balance."""
+        self._unlogged_fee0 += fee0
+        self._unlogged_fee1 += fee1
+
+    def log_balance(self, block: int, timestamp: int, sqrt_price: float, fee0: int, fee1: int, amounts: Tuple[int, int]=None):
+        amount0, amount1 = amounts or (self.amount0_psqrt(sqrt_price), self.amount1_psqrt(sqrt_price))
+        if self._unlogged_fee0 or self._unlogged_fee1:
+            if fee0 < 0 or fee1 < 0:
+                # collected fees are negative, deferred ones get their own row to stay in cumFee
+                self._append_balance(block, timestamp, amount0, amount1, self._unlogged_fee0, self._unlogged_fee1)
+            else:
+                fee0 += self._unlogged_fee0
+                fee1 += self._unlogged_fee1
+            self._unlogged_fee0 = self._unlogged_fee1 = 0
+        self._append_balance(block, timestamp, amount0, amount1, fee0, fee1)
+
+    def _append_balance(self, *row):
+        for column, value in zip(self._balance_columns, row):
+            column.append(value)
     
 
 class PositionReport(object):
 
     def __init__(self, position: PositionInstance) -> None:
         self.position = position
-        self.balance = pd.DataFrame(position.balance)
-        self.balance["collectedFee0"] = self.balance["fee0"].cumsum()
-        self.balance["collectedFee1"] = self.balance["fee1"].cumsum()
-        self.balance["cumFee0"] = self.balance["fee0"].apply(lambda f: f if f>=0 else 0).cumsum()
-        self.balance["cumFee1"] = self.balance["fee1"].apply(lambda f: f if f>=0 else 0).cumsum()
-        self.liquidity_history = pd.DataFrame(position.history)
+        self.balance = pd.DataFrame(dict(zip(PositionBalanceLog._fields, position._balance_columns)))
+        # object columns (wei beyond int64) stay python ints through np.maximum/cumsum
+        fee0 = self.balance["fee0"].values
+        fee1 = self.balance["fee1"].values
+        self.balance["collectedFee0"] = fee0.cumsum()
+        self.balance["collectedFee1"] = fee1.cumsum()
+        self.balance["cumFee0"] = np.maximum(fee0, 0).cumsum()
+        self.balance["cumFee1"] = np.maximum(fee1, 0).cumsum()
+        self.liquidity_history = pd.DataFrame(dict(zip(LiquidityLog._fields, position._history_columns)))
 
     def get_balance(self, index="timestamp", plain=False, draw_plot=False):
         if plain:
@@ -133,10 +176,8 @@ class PositionReport(object):
     
     def plain_balance(self):
         data = {}
-        data["datetime"] = self.balance["timestamp"].apply(datetime.fromtimestamp)
-        for token in [0, 1]:
-            _d = self.position.decimals[token]
-            factor = 10**_d
+        data["datetime"] = to_datetime(self.balance["timestamp"])
+        for token, factor in enumerate(unit_factors(*self.position.decimals)):
             for name in ["amount", "fee", "cumFee", "collectedFee"]:
                 key = name + str(token)
                 data[key] = self.balance[key] / factor
@@ -154,24 +195,21 @@ class SimulationReport(object):
         self.info = info or {}
 
     def total_balance(self, index="timestamp", draw_plot=False, plain=False, **plot_params):
-        balance = self.wallet_balance.drop_duplicates(index, keep="last").set_index(index)[["amount0", "amount1"]].astype("object")
-            
-        cumFee0 = pd.Series(0,  balance.index, dtype="object")
-        cumFee1 = pd.Series(0,  balance.index, dtype="object")
-        for report in self.positions.values():
-            position_balance = report.balance.drop_duplicates(
-                index, keep="last"
-            ).set_index(index)[["amount0", "amount1", "fee0", "fee1", "collectedFee0", "collectedFee1"]].astype("object")
-            amount0 = position_balance["amount0"] + position_balance["collectedFee0"]
-            amount1 = position_balance["amount1"] + position_balance["collectedFee1"]
-            
-            balance["amount0"] += pd.Series(amount0, balance.index, dtype="object").fillna(0)
-            balance["amount1"] += pd.Series(amount1, balance.index, dtype="object").fillna(0)
+        balance = last_by(self.wallet_balance, index)[["amount0", "amount1"]].astype("object")
 
-            cumFee0 += pd.Series(position_balance["fee0"][position_balance["fee0"]>=0].astype("object"), balance.index).fillna(0).astype("object").cumsum()
-            cumFee1 += pd.Series(position_balance["fee1"][position_balance["fee1"]>=0].astype("object"), balance.index).fillna(0).astype("object").cumsum()
-        balance["cumFee0"] = cumFee0
-        balance["cumFee1"] = cumFee1
+        # wei amounts overflow int64, so columns stay python ints (object) but are
+        # added as whole 2d arrays instead of one Series per column and position
+        amounts = balance.values
+        cum_fees = np.zeros(amounts.shape, dtype="object")
+        for report in self.positions.values():
+            position_balance = last_by(report.balance, index)[["amount0", "amount1", "fee0", "fee1", "collectedFee0", "collectedFee1"]].astype("object")
+            position_balance = position_balance.reindex(balance.index).fillna(0).values
+            amounts = amounts + position_balance[:, 0:2] + position_balance[:, 4:6]
+            cum_fees = cum_fees + np.maximum(position_balance[:, 2:4], 0).cumsum(axis=0)
+        balance["amount0"] = amounts[:, 0]
+        balance["amount1"] = amounts[:, 1]
+        balance["cumFee0"] = cum_fees[:, 0]
+        balance["cumFee1"] = cum_fees[:, 1]
         balance["amount0NoFee"] = balance["amount0"] - balance["cumFee0"]
         balance["amount1NoFee"] = balance["amount1"] - balance["cumFee1"]
         balance.reset_index(inplace=True)
@@ -185,30 +223,71 @@ class SimulationReport(object):
         return balance            
 
    
+@lru_cache(maxsize=None)
+def unit_factors(decimal0: int, decimal1: int) -> Tuple[int, int]:
+    """(10**decimal0, 10**decimal1), wei per whole token0 and token1."""
+    return 10 ** decimal0, 10 ** decimal1
+
+
+def to_datetime(timestamps: pd.Series) -> pd.Series:
+    """Naive local datetimes of unix timestamps, same values as apply(datetime.fromtimestamp)."""
+    return pd.to_datetime(timestamps, unit="s", utc=True).dt.tz_convert(tzlocal()).dt.tz_localize(None)
+
+
+def last_by(data: pd.DataFrame, index: str) -> pd.DataFrame:
+    """Last row of every value of column index, indexed by it.
+
+    Same as data.drop_duplicates(index, keep="last").set_index(index), done with
+    one np.unique over the index column.
+    """
+    values = data[index].values
+    _, last = np.unique(values[::-1], return_index=True)
+    return data.iloc[np.sort(len(values) - 1 - last)].set_index(index)
+
+
 def plain_balance(data: pd.DataFrame, decimal0: int, decimal1: int, keep: bool=True, excepts=None):
-    r = {}
-    r["datetime"] = data["timestamp"].apply(datetime.fromtimestamp)
-    f0 = 10**decimal0
-    f1 = 10**decimal1
+    f0, f1 = unit_factors(decimal0, decimal1)
     excepts = excepts or set()
-    for column in data.columns:
-        if column in excepts:
-            continue
-        if "0" in column:
-            r[column] = data[column] / f0
-        elif "1" in column:
-            r[column] = data[column] / f1
-        elif keep:
-            r[column] = data[column]
-
-    return pd.DataFrame(r)
+    columns = [column for column in data.columns if column not in excepts]
+    columns0 = [column for column in columns if "0" in column]
+    columns1 = [column for column in columns if "0" not in column and "1" in column]
+    if not keep:
+        columns = [column for column in columns if column in columns0 or column in columns1]
+
+    # one division per token block instead of one Series per column
+    r = pd.concat([
+        to_datetime(data["timestamp"]).rename("datetime"),
+        pd.DataFrame(data[columns0].values / f0, data.index, columns0),
+        pd.DataFrame(data[columns1].values / f1, data.index, columns1),
+        data[[column for column in columns if column not in columns0 and column not in columns1]],
+    ], axis=1)
+    return r[["datetime"] + columns]
     
 
+SWAP_COLUMNS = ["sqrtPriceX96", "tick", "blockNumber", "liquidity", "timestamp"]
+
+
+def swap_rows(swaps: pd.DataFrame) -> Iterable[tuple]:
+    """(sqrtPriceX96, tick, blockNumber, liquidity, timestamp) of every swap, timestamp 0 if missing."""
+    columns = [
+        swaps[name].tolist() if name in swaps.columns else [0] * len(swaps)
+        for name in SWAP_COLUMNS
+    ]
+    return zip(*columns)
+
+
+def records(data: pd.DataFrame) -> Iterable[dict]:
+    """Rows of data as dicts of python scalars, built one at a time unlike data.to_dict("records")."""
+    names = list(data.columns)
+    for row in zip(*[data[name].tolist() for name in names]):
+        yield dict(zip(names, row))
+
+
 class PoolSimiulation(object):
 
     PRICE_FACTOR = 1 << 96
 
-    def __init__(self, amount0: int, amount1: int, decimal0: int, decimal1: int, fee: PoolFee, price_reverse: bool=False) -> None:
+    def __init__(self, amount0: int, amount1: int, decimal0: int, decimal1: int, fee: PoolFee, price_reverse: bool=False, log_stride: int=1) -> None:
         """Init simulation
 
         :param amount0: Init amount of token0.
@@ -221,6 +300,9 @@ class PoolSimiulation(object):
         :type decimal1: int
         :param fee: Fee of this strategy.
         :type fee: PoolFee
+        :param log_stride: Log position and wallet balances every log_stride swaps, fees of the
+            skipped swaps are added to the next log, defaults to 1
+        :type log_stride: int, optional
         """
         self.decimal0 = decimal0
         self.decimal1 = decimal1
@@ -237,10 +319,22 @@ class PoolSimiulation(object):
         self.timestamp = 0
         self.L = 0 
         self._price_reverse = price_reverse
-        self.wallet_logs: List[WalletLog] = []
-    
+        # wallet history kept column-wise, one list per WalletLog field.
+        # amounts stay python int since 18 decimals tokens overflow int64
+        self._wallet_columns: Tuple[List[int], ...] = tuple([] for _ in WalletLog._fields)
+        self.log_stride = log_stride
+        self._swap_count = 0
+
+    @property
+    def wallet_logs(self) -> List[WalletLog]:
+        return [WalletLog(*row) for row in zip(*self._wallet_columns)]
+
     def record_wallet(self):
-        self.wallet_logs.append(WalletLog(self.block_number, self.timestamp, self.amount0, self.amount1))
+        blocks, timestamps, amounts0, amounts1 = self._wallet_columns
+        blocks.append(self.block_number)
+        timestamps.append(self.timestamp)
+        amounts0.append(self.amount0)
+        amounts1.append(self.amount1)
 
     @property
     def next_token_id(self):
@@ -250,16 +344,19 @@ class PoolSimiulation(object):
     def mint(self, lower: int, upper: int,  amount0: int, amount1: int) -> Tuple[PositionInstance, int, int]:
         # TODO: create a PositionInstance
         fee = self.fee
-        lower = lower - lower % 60
-        upper = upper - upper % 60
+        spacing = fee.tick_spacing
+        lower = lower - lower % spacing
+        upper = upper - upper % spacing
 
         assert self.amount0 >= amount0, f"Amount for token0 not enough, required={amount0}, holding={self.amount0}"
         assert self.amount1 >= amount1, f"Amount for token1 not enough, required={amount1}, holding={self.amount1}"
 
+        # same cached entry PositionInstance reads its range from
+        low_price_sqrt, _, high_price_sqrt, _ = tick_range_sqrt(lower, upper)
         l, amt0, amt1 = PositionUtil.cal_liquidity_sqrt(
             self.sqrt_price,
-            1.0001 ** (lower/2),
-            1.0001 ** (upper/2),
+            low_price_sqrt,
+            high_price_sqrt,
             amount0,
             amount1
         )
@@ -346,21 +443,39 @@ class PoolSimiulation(object):
         self.L = swap_event["liquidity"]
 
     def on_swap(self, swap_event: dict):
+        self._on_swap(
+            swap_event["sqrtPriceX96"],
+            swap_event["tick"],
+            swap_event["blockNumber"],
+            swap_event["liquidity"],
+            swap_event.get("timestamp", 0)
+        )
+
+    def _on_swap(self, sqrt_price_x96: int, tick: int, block_number: int, liquidity: int, timestamp: int):
         former_price = self.sqrt_price
-        self.sqrt_price_x96 = int(swap_event["sqrtPriceX96"])
-        self.tick = swap_event["tick"]
-        self.block_number = swap_event["blockNumber"]
-        self.L = swap_event["liquidity"]
+        self.sqrt_price_x96 = int(sqrt_price_x96)
+        self.tick = tick
+        self.block_number = block_number
+        self.L = liquidity
         self.sqrt_price = self.sqrt_price_x96 / self.PRICE_FACTOR
-        self.timestamp = swap_event.get("timestamp", 0)
+        self.timestamp = timestamp
+
+        self._swap_count += 1
+        if self._swap_count % self.log_stride:
+            for position in self.valid_positions.values():
+                position.defer_fees(*position.swap(former_price, self.sqrt_price))
+            return
 
         for position in self.valid_positions.values():
-            fee0, fee1 = position.swap(former_price, self.sqrt_price)
+            # amounts at the new price serve both the fee and the balance log
+            amounts = position.amount0_psqrt(self.sqrt_price), position.amount1_psqrt(self.sqrt_price)
+            fee0, fee1 = position.swap(former_price, self.sqrt_price, amounts)
             position.log_balance(
                 self.block_number,
                 self.timestamp,
                 self.sqrt_price,
-                fee0, fee1
+                fee0, fee1,
+                amounts
             )
         self.record_wallet()
     
@@ -411,15 +526,15 @@ class PoolSimiulation(object):
             
     def run_on_swap(self, dfs: Iterable[pd.DataFrame]):
         for df in dfs:
-            for swap in df.to_dict("record"):
-                self.on_swap(swap)
+            for swap in swap_rows(df):
+                self._on_swap(*swap)
     
     def run(self, swaps: pd.DataFrame, time_data: pd.DataFrame):
         """Run simulation base on parsed data
 
         :param swaps: SwapEvent data for simulation.
         :type swaps: pd.DataFrame
-        :param time_data: Timeseries data which will be splitted ad data.to_dict("record") and parse into self.on_time(data) 
+        :param time_data: Timeseries data, every row is parsed into self.on_time(data) as a dict
         :type time_data: pd.DataFrame
 
         swaps:
@@ -440,28 +555,18 @@ class PoolSimiulation(object):
 
 
         """
-        swap_events = swaps.to_dict("record").__iter__()
-        time_list = time_data.to_dict("record").__iter__()
-
-        swap = next(swap_events)
-        data = next(time_list)
-        while True:
-            if (swap["timestamp"], 1) <= (data["timestamp"], 0):
-                self.on_swap(swap)
-                try:
-                    swap = next(swap_events)
-                except StopIteration:
-                    for i in range(time_list.__length_hint__()):
-                        self.on_time(next(time_list))
-                    break
-            else:
-                self.on_time(data)
-                try:
-                    data = next(time_list)
-                except StopIteration:
-                    for i in range(swap_events.__length_hint__()):
-                        self.on_swap(next(swap_events))
-                    break
+        swap_events = list(swap_rows(swaps))
+        # both frames are sorted by timestamp, time data goes first on equal timestamps
+        swap_stops = np.searchsorted(swaps["timestamp"].values, time_data["timestamp"].values, side="left")
+
+        start = 0
+        for data, stop in zip(records(time_data), swap_stops.tolist()):
+            for swap in swap_events[start:stop]:
+                self._on_swap(*swap)
+            start = max(start, stop)
+            self.on_time(data)
+        for swap in swap_events[start:]:
+            self._on_swap(*swap)
                 
     
     def get_position(self, token_id: int) -> PositionInstance:
@@ -472,7 +577,7 @@ class PoolSimiulation(object):
 
         Algorithn code should be write in here.
 
-        :param data: dict item generated by time_data.to_dict("record") parsed in self.run(swaps, time_data)
+        :param data: dict of one time_data row (column name -> value) parsed in self.run(swaps, time_data)
         :type data: dict
         """
         pass 
@@ -483,7 +588,7 @@ class PoolSimiulation(object):
         :return: [description]
         :rtype: SimulationReport
         """
-        wallet_balance = pd.DataFrame(self.wallet_logs)
+        wallet_balance = pd.DataFrame(dict(zip(WalletLog._fields, self._wallet_columns)))
         positions: Dict[int, PositionReport] = {}
         for position in self.positions.values():
             positions[position.token_id] = PositionReport(position)
@@ -495,6 +600,55 @@ class PoolSimiulation(object):
         return SimulationReport(wallet_balance, positions, info)
 
 
+_WORKER_DATA: Dict[str, pd.DataFrame] = {}
+
+
+def _init_backtest_worker(swaps: pd.DataFrame, time_data: pd.DataFrame):
+    _WORKER_DATA["swaps"] = swaps
+    _WORKER_DATA["time_data"] = time_data
+
+
+def _run_backtest(config: BacktestConfig) -> SimulationReport:
+    swaps = _WORKER_DATA["swaps"]
+    strategy: PoolSimiulation = config.strategy_cls(*config.args, **config.kwargs)
+    strategy.init(swaps.iloc[0].to_dict())
+    strategy.run(swaps, _WORKER_DATA["time_data"])
+    return strategy.report()
+
+
+def run_backtests(
+    configs: Iterable[BacktestConfig], swaps: pd.DataFrame, time_data: pd.DataFrame,
+    max_workers: Optional[int]=None
+    ) -> List[SimulationReport]:
+    """Run independent strategy backtests over the same data in parallel processes.
+
+    swaps and time_data are sent once to each worker process instead of once per config.
+
+    >>> configs = [
+            BacktestConfig(HoldStrategy, (init_amount0, init_amount1, decimal0, decimal1, fee, True), {})
+            for fee in (PoolFee.low, PoolFee.medium)
+        ]
+        reports = run_backtests(configs, swapdata, pricedata_res)
+
+    :param configs: strategy class and its init params for each backtest
+    :type configs: Iterable[BacktestConfig]
+    :param swaps: SwapEvent data for simulation, see PoolSimiulation.run
+    :type swaps: pd.DataFrame
+    :param time_data: Timeseries data for simulation, see PoolSimiulation.run
+    :type time_data: pd.DataFrame
+    :param max_workers: number of worker processes, defaults to os.cpu_count()
+    :type max_workers: Optional[int], optional
+    :return: reports in the same order as configs
+    :rtype: List[SimulationReport]
+    """
+    with ProcessPoolExecutor(
+        max_workers=max_workers or os.cpu_count(),
+        initializer=_init_backtest_worker,
+        initargs=(swaps, time_data)
+    ) as executor:
+        return list(executor.map(_run_backtest, configs))
+
+
 class DataUtilMongoDB(object):
 
     """Util for reading SwapEvent data from Mongodb.
@@ -557,13 +711,26 @@ class DataUtilMongoDB(object):
             filters,
             projection={"_id": 0}
         )
-        data = pd.DataFrame(list(cursor))
+        data = pd.DataFrame.from_records(cursor)
         for key in self.SWAP_BIGINT_COLUMNS:
-            data[key] = data[key].apply(int)
+            # strings beyond int64, int64 or float columns otherwise, python ints in any case
+            data[key] = [int(value) for value in data[key].tolist()]
         
-        blocks = self.blocks(list(data["blockNumber"]))
+        blocks = self.blocks(data["blockNumber"].unique().tolist())
         block_map = {block["number"]: block["timestamp"] for block in blocks}
-        data["timestamp"] = data["blockNumber"].map(block_map)
+        numbers = np.array(sorted(block_map), dtype=np.int64)
+        timestamps = np.array([block_map[number] for number in numbers.tolist()], dtype=np.int64)
+        block_numbers = data["blockNumber"].values
+        if not len(numbers):
+            data["timestamp"] = np.nan
+            return data
+        index = np.searchsorted(numbers, block_numbers).clip(max=len(numbers) - 1)
+        found = numbers[index] == block_numbers
+        if found.all():
+            data["timestamp"] = timestamps[index]
+        else:
+            # blocks missing from the block collection get a NaN timestamp, like Series.map does
+            data["timestamp"] = np.where(found, timestamps[index], np.nan)
         return data
     
     def blocks(self, numbers: List[int]) -> List[Dict]:
@@ -1,6 +1,139 @@
 import math
-from typing import Union
+import time
+from functools import lru_cache
+from typing import Iterable, Tuple, Union
 import warnings
+import numpy as np
+from .contracts.enums import TICK_SPACING
+
+try:
+    from numba import njit, prange
+except ImportError:
+    def njit(*args, **kwargs):
+        """numba is optional: without it jitted functions run as plain python."""
+        if len(args) == 1 and callable(args[0]):
+            return args[0]
+        return lambda func: func
+
+    prange = range
+
+
+LN_10001 = math.log(1.0001)
+
+# TickMath, see v3-core/contracts/libraries/TickMath.sol
+MIN_TICK = -887272
+MAX_TICK = 887272
+Q96 = 1 << 96
+MAX_UINT256 = (1 << 256) - 1
+# ratio factors for the bits 0x2 .. 0x80000 of abs(tick), all Q128.128
+_TICK_RATIOS = (
+    0xfff97272373d413259a46990580e213a,
+    0xfff2e50f5f656932ef12357cf3c7fdcc,
+    0xffe5caca7e10e4e61c3624eaa0941cd0,
+    0xffcb9843d60f6159c9db58835c926644,
+    0xff973b41fa98c081472e6896dfb254c0,
+    0xff2ea16466c96a3843ec78b326b52861,
+    0xfe5dee046a99a2a811c461f1969c3053,
+    0xfcbe86c7900a88aedcffc83b479aa3a4,
+    0xf987a7253ac413176f2b074cf7815e54,
+    0xf3392b0822b70005940c7a398e4b70f3,
+    0xe7159475a2c29b7443b29c7fa6e889d9,
+    0xd097f3bdfd2022b8845ad8f792aa5825,
+    0xa9f746462d870fdf8a65dc1f90e061e5,
+    0x70d869a156d2a1b890bb3df62baf32f7,
+    0x31be135f97d08fd981231505542fcfa6,
+    0x9aa508b5b7a84e1c677de54f3e99bc9,
+    0x5d6af8dedb81196699c329225ee604,
+    0x2216e584f5fa1ea926041bedfe98,
+    0x48a170391f7dc42444e8fa2,
+)
+
+
+def get_sqrt_ratio_at_tick(tick: int) -> int:
+    """sqrt(1.0001**tick) * 2**96 as computed on chain by TickMath.getSqrtRatioAtTick.
+
+    :param tick: price tick, integral floats like 195060.0 are accepted
+    :type tick: int
+    :return: sqrtPriceX96
+    :rtype: int
+    """
+    if tick != int(tick):
+        raise ValueError(f"Invalid tick: {tick}, tick should be an integer")
+    tick = int(tick)
+    abs_tick = abs(tick)
+    assert abs_tick <= MAX_TICK, f"Invalid tick: {tick}"
+    ratio = 0xfffcb933bd6fad37aa2d162d1a594001 if abs_tick & 0x1 else 0x100000000000000000000000000000000
+    bit = 0x2
+    for factor in _TICK_RATIOS:
+        if abs_tick & bit:
+            ratio = (ratio * factor) >> 128
+        bit <<= 1
+    if tick > 0:
+        ratio = MAX_UINT256 // ratio
+    return (ratio >> 32) + (1 if ratio & 0xffffffff else 0)
+
+
+def get_tick_at_sqrt_ratio(sqrt_price_x96: int) -> int:
+    """Greatest tick whose sqrt ratio is <= sqrt_price_x96, same as TickMath.getTickAtSqrtRatio.
+
+    :param sqrt_price_x96: UniswapV3Pool.slot0()[0]
+    :type sqrt_price_x96: int
+    :return: price tick
+    :rtype: int
+    """
+    tick = math.floor(2 * math.log(sqrt_price_x96 / Q96) / LN_10001)
+    tick = min(max(tick, MIN_TICK), MAX_TICK)
+    # the float estimate is off by at most one tick, settle it with the exact integer ratios
+    while tick > MIN_TICK and get_sqrt_ratio_at_tick(tick) > sqrt_price_x96:
+        tick -= 1
+    while tick < MAX_TICK and get_sqrt_ratio_at_tick(tick + 1) <= sqrt_price_x96:
+        tick += 1
+    return tick
+
+
+def sqrt_price_at_tick(tick: int) -> float:
+    """sqrt of price on chain at tick, 1.0001**(tick/2) rounded like the pool does."""
+    return get_sqrt_ratio_at_tick(tick) / Q96
+
+
+# 1.0001**(tick/2) and 1.0001**(-tick/2) memoized per tick for PositionUtil.amount*_t,
+# backtests query the same ticks over and over and a dict hit is about half the cost of the pow
+_TICK_SQRT = {}
+_TICK_SQRT_R = {}
+
+
+@lru_cache(maxsize=1024)
+def tick_range_sqrt(tick_lower: int, tick_upper: int) -> Tuple[float, float, float, float]:
+    """sqrt prices of a position range and their reciprocals, cached since strategies reuse the same bands.
+
+    :return: Tuple[low_price_sqrt, low_price_sqrt_r, high_price_sqrt, high_price_sqrt_r]
+    :rtype: Tuple[float, float, float, float]
+    """
+    low_price_sqrt = sqrt_price_at_tick(tick_lower)
+    high_price_sqrt = sqrt_price_at_tick(tick_upper)
+    return low_price_sqrt, 1 / low_price_sqrt, high_price_sqrt, 1 / high_price_sqrt
+
+
+@lru_cache(maxsize=None)
+def decimal_factors(decimal0: int, decimal1: int) -> Tuple[float, float, Union[int, float]]:
+    """Tuple[10**-decimal0, 10**-decimal1, 10**(decimal1-decimal0)], constant per token pair."""
+    return 10 ** -decimal0, 10 ** -decimal1, 10 ** (decimal1 - decimal0)
+
+
+@lru_cache(maxsize=None)
+def get_price_converter(decimal0: int, decimal1: int) -> "PriceConverter":
+    """PriceConverter shared by every position of the same token pair, do not modify it."""
+    return PriceConverter(decimal0, decimal1)
+
+
+_DEPRECATION_WARNED = set()
+
+
+def _warn_deprecated(name: str, replacement: str):
+    """warnings.warn once per process for a deprecated function, it is called in pricing loops."""
+    if name not in _DEPRECATION_WARNED:
+        _DEPRECATION_WARNED.add(name)
+        warnings.warn(f"Function {name} is deprecated, use {replacement} instead.", stacklevel=3)
 
 
 class PositionUtil:
@@ -43,14 +176,23 @@ class PositionUtil:
 
     """
 
+    __slots__ = (
+        "liquidity", "tick_lower", "tick_upper",
+        "low_price_sqrt", "low_price_sqrt_r", "high_price_sqrt", "high_price_sqrt_r",
+        "_amount0_edge", "_amount1_edge", "_liquidity0_factor", "_sqrt_diff",
+        "decimal0", "decimal1", "decimals", "factor0", "factor1", "factor",
+        "cex_price_lower", "cex_price_upper",
+    )
+
     def __init__(
             self, liquidity: Union[float, int], tick_lower: int, tick_upper: int,
-            decimal0: int = 0, decimal1: int = 0, price_reverse: bool = False
+            decimal0: int = 0, decimal1: int = 0, price_reverse: bool = False,
+            tick_spacing: int = TICK_SPACING[3000]
     ) -> None:
         """Position util for calculating exporsure.
 
         `liquidity`, `tick_lower` and `tick_upper` can be achieved by calling `NonfungiblePositionManager.positions`
-        tick_lower, tick_upper, liquidity = NonfungiblePositionManager.positions()[5, 6, 7]
+        tick_lower, tick_upper, liquidity = NonfungiblePositionManager.positions(token_id)[5:8]
         
         see: https://docs.uniswap.org/protocol/reference/periphery/NonfungiblePositionManager#positions
         
@@ -64,27 +206,30 @@ class PositionUtil:
         :type decimal0: int, optional
         :param decimal1: decimal of token1, defaults to 0
         :type decimal1: int, optional
+        :param tick_spacing: tick spacing of the pool fee, see TICK_SPACING, defaults to 60 (0.3% pools)
+        :type tick_spacing: int, optional
         """
         assert tick_lower < tick_upper, "Edge should be: tick_lower < tick_upper"
-        assert tick_lower % 60 == 0, f"Invalid tick_lower: {tick_lower}, tick % 60 should be 0"
-        assert tick_upper % 60 == 0, f"Invalid tick_upper: {tick_upper}, tick % 60 should be 0"
+        assert tick_lower % tick_spacing == 0, f"Invalid tick_lower: {tick_lower}, tick % {tick_spacing} should be 0"
+        assert tick_upper % tick_spacing == 0, f"Invalid tick_upper: {tick_upper}, tick % {tick_spacing} should be 0"
         self.liquidity = liquidity
         self.tick_lower = tick_lower
         self.tick_upper = tick_upper
-        self.low_price_sqrt = 1.0001 ** (tick_lower / 2)
-        self.low_price_sqrt_r = 1 / self.low_price_sqrt
-        self.high_price_sqrt = 1.0001 ** (tick_upper / 2)
-        self.high_price_sqrt_r = 1 / self.high_price_sqrt
+        (
+            self.low_price_sqrt, self.low_price_sqrt_r,
+            self.high_price_sqrt, self.high_price_sqrt_r
+        ) = tick_range_sqrt(tick_lower, tick_upper)
+        # range constants of cal_liquidity_inst case 1 and case 3
+        self._sqrt_diff = self.high_price_sqrt - self.low_price_sqrt
+        self._liquidity0_factor = self.high_price_sqrt * self.low_price_sqrt / self._sqrt_diff
         self._amount0_edge = 0
         self._amount1_edge = 0
         self.update_liquidity(liquidity)
         self.decimal0 = decimal0
         self.decimal1 = decimal1
         self.decimals = (decimal0, decimal1)
-        self.factor0 = 10 ** -decimal0
-        self.factor1 = 10 ** -decimal1
-        self.factor = 10 ** (decimal1 - decimal0)
-        pc = PriceConverter(decimal0, decimal1)
+        self.factor0, self.factor1, self.factor = decimal_factors(decimal0, decimal1)
+        pc = get_price_converter(decimal0, decimal1)
         if not price_reverse:
             self.cex_price_lower = pc.tick_to_price(self.tick_lower)
             self.cex_price_upper = pc.tick_to_price(self.tick_upper)
@@ -96,42 +241,43 @@ class PositionUtil:
     def mint(
         cls, tick_now: int, tick_lower: int, tick_upper: int, 
         amount0: int=0, amount1: int=0,
-        decimal0: int = 0, decimal1: int = 0
+        decimal0: int = 0, decimal1: int = 0,
+        tick_spacing: int = TICK_SPACING[3000],
         ):
 
-        liquidity, _, _ = cls.cal_liquidity(
-            1.0001 ** tick_now,
-            1.0001 ** tick_upper,
-            1.0001 ** tick_lower,
+        liquidity, _, _ = cls.cal_liquidity_sqrt(
+            sqrt_price_at_tick(tick_now),
+            sqrt_price_at_tick(tick_lower),
+            sqrt_price_at_tick(tick_upper),
             amount0,
             amount1
         )
-        return cls(liquidity, tick_lower, tick_upper, decimal0, decimal1)
+        return cls(liquidity, tick_lower, tick_upper, decimal0, decimal1, tick_spacing=tick_spacing)
 
     @classmethod
     def mint_by_price(
         cls, price: float, price_lower: float, price_upper: float, 
         qty0: float, qty1: float,
         decimal0: int = 0, decimal1: int = 0,
-        reverted=False,
+        reverted=False, tick_spacing: int = TICK_SPACING[3000],
     ):
         if reverted:
-            price = 1 / price,
-            price_lower, price_upper = 1 / price_upper, 1 / price_lower
+            price, price_lower, price_upper = 1 / price, 1 / price_upper, 1 / price_lower
         factor = 10**(decimal1-decimal0)
-        price = price* factor
-        price_upper = price_upper* factor
-        price_upper = price_upper* factor
-        liquidity, _, _ = cls.cal_liquidity(
-            price,
-            price_upper,
-            price_lower,
+        price = price * factor
+        # edges are rounded outwards onto the tick spacing, so a range narrower than one spacing still spans one
+        tick_lower = math.floor(math.log(price_lower * factor) / LN_10001 / tick_spacing) * tick_spacing
+        tick_upper = math.ceil(math.log(price_upper * factor) / LN_10001 / tick_spacing) * tick_spacing
+        if tick_lower >= tick_upper:
+            raise ValueError(f"Invalid price range: [{price_lower}, {price_upper}], price_lower should be below price_upper")
+        liquidity, _, _ = cls.cal_liquidity_sqrt(
+            math.sqrt(price),
+            sqrt_price_at_tick(tick_lower),
+            sqrt_price_at_tick(tick_upper),
             qty0*10**decimal0,
             qty1*10**decimal1
         )
-        tick_lower = math.log(price_lower, 1.0001)
-        tick_upper = math.log(price_upper, 1.0001)
-        return cls(liquidity, tick_lower, tick_upper, decimal0, decimal1)
+        return cls(liquidity, tick_lower, tick_upper, decimal0, decimal1, tick_spacing=tick_spacing)
 
     def update_liquidity(self, liquidity: Union[float, int]):
         self.liquidity = liquidity
@@ -154,7 +300,10 @@ class PositionUtil:
         if tick <= self.tick_lower:
             return self._amount0_edge
         elif tick < self.tick_upper:
-            return int(self.liquidity * (1.0001 ** (-tick / 2) - self.high_price_sqrt_r))
+            sqrt_r = _TICK_SQRT_R.get(tick)
+            if sqrt_r is None:
+                sqrt_r = _TICK_SQRT_R[tick] = 1.0001 ** (-tick / 2)
+            return int(self.liquidity * (sqrt_r - self.high_price_sqrt_r))
         else:
             return 0
 
@@ -174,11 +323,71 @@ class PositionUtil:
         if tick <= self.tick_lower:
             return 0
         elif tick < self.tick_upper:
-
-            return int(self.liquidity * (1.0001 ** (tick / 2) - self.low_price_sqrt))
+            sqrt_p = _TICK_SQRT.get(tick)
+            if sqrt_p is None:
+                sqrt_p = _TICK_SQRT[tick] = 1.0001 ** (tick / 2)
+            return int(self.liquidity * (sqrt_p - self.low_price_sqrt))
         else:
             return self._amount1_edge
 
+    def amount0_t_batch(self, ticks: np.ndarray) -> np.ndarray:
+        """amount0_t of every tick in ticks, truncated like int() but kept as float64
+        since wei amounts do not fit in int64.
+
+        :param ticks: price ticks
+        :type ticks: np.ndarray
+        :return: amount0 of each tick
+        :rtype: np.ndarray
+        """
+        ticks = np.asarray(ticks)
+        res = np.trunc(float(self.liquidity) * (np.power(1.0001, -ticks / 2) - self.high_price_sqrt_r))
+        return np.where(ticks <= self.tick_lower, float(self._amount0_edge), np.where(ticks < self.tick_upper, res, 0.0))
+
+    def amount1_t_batch(self, ticks: np.ndarray) -> np.ndarray:
+        """amount1_t of every tick in ticks, see amount0_t_batch.
+
+        :param ticks: price ticks
+        :type ticks: np.ndarray
+        :return: amount1 of each tick
+        :rtype: np.ndarray
+        """
+        ticks = np.asarray(ticks)
+        res = np.trunc(float(self.liquidity) * (np.power(1.0001, ticks / 2) - self.low_price_sqrt))
+        return np.where(ticks <= self.tick_lower, 0.0, np.where(ticks < self.tick_upper, res, float(self._amount1_edge)))
+
+    @staticmethod
+    def amounts_t(liquidity: Union[float, int], tick: int, tick_lower: int, tick_upper: int) -> Tuple[int, int]:
+        """Same as `PositionUtil(liquidity, tick_lower, tick_upper)` then `amount0_t(tick)`, `amount1_t(tick)`,
+        without building the instance.
+
+        :param liquidity: liquidity of the position
+        :type liquidity: Union[float, int]
+        :param tick: price tick
+        :type tick: int
+        :param tick_lower: low tick of the position
+        :type tick_lower: int
+        :param tick_upper: high tick of the position
+        :type tick_upper: int
+        :return: Tuple[amount0, amount1]
+        :rtype: Tuple[int, int]
+        """
+        low_price_sqrt, low_price_sqrt_r, high_price_sqrt, high_price_sqrt_r = tick_range_sqrt(tick_lower, tick_upper)
+        if tick <= tick_lower:
+            return int(liquidity * (low_price_sqrt_r - high_price_sqrt_r)), 0
+        elif tick < tick_upper:
+            sqrt_r = _TICK_SQRT_R.get(tick)
+            if sqrt_r is None:
+                sqrt_r = _TICK_SQRT_R[tick] = 1.0001 ** (-tick / 2)
+            sqrt_p = _TICK_SQRT.get(tick)
+            if sqrt_p is None:
+                sqrt_p = _TICK_SQRT[tick] = 1.0001 ** (tick / 2)
+            return (
+                int(liquidity * (sqrt_r - high_price_sqrt_r)),
+                int(liquidity * (sqrt_p - low_price_sqrt))
+            )
+        else:
+            return 0, int(liquidity * (high_price_sqrt - low_price_sqrt))
+
     def amount0_psqrt(self, psqrt: float) -> Union[int, float]:
         """Calculate amount0 by sqaurt of price on chain
 
@@ -218,6 +427,49 @@ class PositionUtil:
         else:
             return self._amount1_edge
 
+    def unit_amounts(self, psqrt: float) -> Tuple[float, float]:
+        """Amounts per unit of liquidity at psqrt.
+
+        amount0_psqrt(psqrt) == int(self.liquidity * u0) and likewise for amount1,
+        so amounts of several liquidities at one price share a single range check.
+
+        :param psqrt: sqaurt of price on chain
+        :type psqrt: float
+        :return: (u0, u1)
+        :rtype: Tuple[float, float]
+        """
+        if psqrt <= self.low_price_sqrt:
+            return self.low_price_sqrt_r - self.high_price_sqrt_r, 0.0
+        elif psqrt < self.high_price_sqrt:
+            return 1 / psqrt - self.high_price_sqrt_r, psqrt - self.low_price_sqrt
+        else:
+            return 0.0, self.high_price_sqrt - self.low_price_sqrt
+
+    def amount0_psqrt_batch(self, psqrt: np.ndarray) -> np.ndarray:
+        """amount0_psqrt of every value in psqrt, see amount0_t_batch.
+
+        :param psqrt: sqaurt of prices on chain
+        :type psqrt: np.ndarray
+        :return: amount0 of each price
+        :rtype: np.ndarray
+        """
+        psqrt = np.asarray(psqrt, dtype=float)
+        with np.errstate(divide="ignore"):
+            res = np.trunc(float(self.liquidity) * (1 / psqrt - self.high_price_sqrt_r))
+        return np.where(psqrt <= self.low_price_sqrt, float(self._amount0_edge), np.where(psqrt < self.high_price_sqrt, res, 0.0))
+
+    def amount1_psqrt_batch(self, psqrt: np.ndarray) -> np.ndarray:
+        """amount1_psqrt of every value in psqrt, see amount0_t_batch.
+
+        :param psqrt: sqaurt of prices on chain
+        :type psqrt: np.ndarray
+        :return: amount1 of each price
+        :rtype: np.ndarray
+        """
+        psqrt = np.asarray(psqrt, dtype=float)
+        res = np.trunc(float(self.liquidity) * (psqrt - self.low_price_sqrt))
+        return np.where(psqrt <= self.low_price_sqrt, 0.0, np.where(psqrt < self.high_price_sqrt, res, float(self._amount1_edge)))
+
     def exposure0(self, price: float, reverted=False):
         """Calculate exposure of token0 by cex price
         
@@ -230,12 +482,8 @@ class PositionUtil:
         :return: expected exposure of token0 on cex 
         :rtype: [type]
         """
-        warnings.warn("Function exposure0 is deprecated, use qty0 instead.")
-
-        if reverted:
-            price = 1 / price
-
-        return self.amount0_psqrt(math.sqrt(price * self.factor)) * self.factor0
+        _warn_deprecated("exposure0", "qty0")
+        return self.qty0(price, reverted)
 
     def exposure1(self, price: float, reverted=False):
         """Calculate exposure of token0 by cex price
@@ -249,42 +497,101 @@ class PositionUtil:
         :return: expected exposure of token1 on cex 
         :rtype: [type]
         """
-        warnings.warn("Function exposure1 is deprecated, use qty1 instead.")
-
-        if reverted:
-            price = 1 / price
+        _warn_deprecated("exposure1", "qty1")
+        return self.qty1(price, reverted)
 
-        return self.amount1_psqrt(math.sqrt(price * self.factor)) * self.factor1
-
-    def qty0(self, price: float, reverted=False):
+    def qty0(self, price: Union[float, np.ndarray], reverted=False):
         """Calculate quantity (amount in cex) of token0 by cex price
         
-        :param price: cex price
-        :type price: float
+        :param price: cex price, or an array of prices
+        :type price: Union[float, np.ndarray]
         :param reverted: True if price=token1/token0, defaults to False
         :type reverted: bool, optional
         :return: expected exposure of token0 on cex 
         :rtype: [type]
         """
-        if reverted:
-            price = 1 / price
-
-        return self.amount0_psqrt(math.sqrt(price * self.factor)) * self.factor0
-
-    def qty1(self, price: float, reverted=False):
+        if isinstance(price, (np.ndarray, list, tuple)):
+            price = np.asarray(price)
+            if reverted:
+                price = 1 / price
+            return self.amount0_psqrt_batch(np.sqrt(price * self.factor)) * self.factor0
+        return self.amount0_psqrt(math.sqrt((1 / price if reverted else price) * self.factor)) * self.factor0
+
+    def qty1(self, price: Union[float, np.ndarray], reverted=False):
         """Calculate quantity (amount in cex) of token0 by cex price
         
-        :param price: cex price
-        :type price: float
+        :param price: cex price, or an array of prices
+        :type price: Union[float, np.ndarray]
         :param reverted: True if price=token1/token0, defaults to False
         :type reverted: bool, optional
         :return: expected exposure of token1 on cex 
         :rtype: [type]
         """
+        if isinstance(price, (np.ndarray, list, tuple)):
+            price = np.asarray(price)
+            if reverted:
+                price = 1 / price
+            return self.amount1_psqrt_batch(np.sqrt(price * self.factor)) * self.factor1
+        return self.amount1_psqrt(math.sqrt((1 / price if reverted else price) * self.factor)) * self.factor1
+
+    def qty(self, price: Union[float, np.ndarray], reverted=False) -> Tuple[Union[float, np.ndarray], Union[float, np.ndarray]]:
+        """(qty0(price), qty1(price)) with the price conversion and sqrt done once
+
+        :param price: cex price, or an array of prices (see qty_batch)
+        :type price: Union[float, np.ndarray]
+        :param reverted: True if price=token1/token0, defaults to False
+        :type reverted: bool, optional
+        :return: Tuple[qty0, qty1]
+        :rtype: Tuple[Union[float, np.ndarray], Union[float, np.ndarray]]
+        """
+        if isinstance(price, (np.ndarray, list, tuple)):
+            return self.qty_batch(price, reverted)
+        psqrt = math.sqrt((1 / price if reverted else price) * self.factor)
+        return self.amount0_psqrt(psqrt) * self.factor0, self.amount1_psqrt(psqrt) * self.factor1
+
+    def qty_batch(self, prices: np.ndarray, reverted=False) -> Tuple[np.ndarray, np.ndarray]:
+        """qty0 and qty1 of every price in prices in one compiled (parallel with numba) loop.
+
+        :param prices: cex prices
+        :type prices: np.ndarray
+        :param reverted: True if price=token1/token0, defaults to False
+        :type reverted: bool, optional
+        :return: Tuple[qty0 of each price, qty1 of each price]
+        :rtype: Tuple[np.ndarray, np.ndarray]
+        """
+        prices = np.asarray(prices, dtype=np.float64)
         if reverted:
-            price = 1 / price
+            prices = 1 / prices
+        out0 = np.empty_like(prices)
+        out1 = np.empty_like(prices)
+        _qty_batch(
+            prices, float(self.factor), self.factor0, self.factor1, float(self.liquidity),
+            self.low_price_sqrt, self.high_price_sqrt, self.high_price_sqrt_r,
+            float(self._amount0_edge), float(self._amount1_edge), out0, out1
+        )
+        return out0, out1
 
-        return self.amount1_psqrt(math.sqrt(price * self.factor)) * self.factor1
+    def cal_liquidity_inst(self, sqrt_price: float, amt0: int, amt1: int):
+        """Same as `cal_liquidity_sqrt(sqrt_price, self.low_price_sqrt, self.high_price_sqrt, amt0, amt1)`,
+        with the out of range cases reduced to one operation on precomputed range constants.
+
+        :param sqrt_price: sqaurt of price on chain
+        :type sqrt_price: float
+        :param amt0: amount of token0
+        :type amt0: int
+        :param amt1: amount of token1
+        :type amt1: int
+        :return: Tuple[liquidity, amount0, amount1]
+        :rtype: Tuple[int, int, int]
+        """
+        if sqrt_price <= self.low_price_sqrt:
+            assert amt0, f"When cprice({sqrt_price}) <= lower({self.low_price_sqrt}), amt0 must bigger than 0"
+            return int(amt0 * self._liquidity0_factor), amt0, 0
+        elif sqrt_price <= self.high_price_sqrt:
+            return self.cal_liquidity_sqrt(sqrt_price, self.low_price_sqrt, self.high_price_sqrt, amt0, amt1)
+        else:
+            assert amt1, f"When upper({self.high_price_sqrt}) < cprice({sqrt_price}), amt1 must bigger than 0"
+            return int(amt1 / self._sqrt_diff), 0, amt1
 
     @staticmethod
     def cal_liquidity_sqrt(sqrt_price: float, sqrt_lower: float, sqrt_upper: float, amt0: int, amt1: int):
@@ -321,27 +628,25 @@ class PositionUtil:
 
         elif sqrt_price <= sqrt_upper:
             assert amt0 or amt1
-            l0 = math.inf
-            l1 = math.inf
-            if amt0:
-
-                l0 = int(
-                    amt0 * (sqrt_upper * sqrt_price) / (sqrt_upper - sqrt_price)
-                )
-
-            if amt1:
-                l1 = int(
-                    amt1 / (sqrt_price - sqrt_lower)
-                )
+            # shared by the liquidity of each side and the amount of the other side
+            upper_price = sqrt_upper * sqrt_price
+            upper_diff = sqrt_upper - sqrt_price
+            lower_diff = sqrt_price - sqrt_lower
+            # single sided: only one liquidity to compute, no min to take
+            if not amt1:
+                l0 = int(amt0 * upper_price / upper_diff)
+                return l0, amt0, int(l0 * lower_diff)
+            if not amt0:
+                l1 = int(amt1 / lower_diff)
+                return l1, int(l1 * upper_diff / upper_price), amt1
+
+            l0 = int(amt0 * upper_price / upper_diff)
+            l1 = int(amt1 / lower_diff)
             if l0 < l1:
-                amt1 = int(
-                    l0 * (sqrt_price - sqrt_lower)
-                )
+                amt1 = int(l0 * lower_diff)
                 return l0, amt0, amt1
             else:
-                amt0 = int(
-                    l1 * (sqrt_upper - sqrt_price) / (sqrt_upper * sqrt_price)
-                )
+                amt0 = int(l1 * upper_diff / upper_price)
                 return l1, amt0, amt1
 
         # Case 3: upper < cprice
@@ -377,13 +682,15 @@ class PositionUtil:
         :type amt1: int
         """
 
-        
+        sqrt_upper = math.sqrt(upper)
+        sqrt_lower = math.sqrt(lower)
+
         # Case 1: cprice <= lower
         # liquidity = amt0 * (sqrt(upper) * sqrt(lower)) / (sqrt(upper) - sqrt(lower))
         if cprice <= lower:
             assert amt0, f"When cprice({cprice}) <= lower({lower}), amt0 must bigger than 0"
             return int(
-                amt0 * (math.sqrt(upper) * math.sqrt(lower) / (math.sqrt(upper) - math.sqrt(lower)))
+                amt0 * (sqrt_upper * sqrt_lower / (sqrt_upper - sqrt_lower))
             ), amt0, 0
 
         # Case 2: lower < cprice <= upper
@@ -392,26 +699,33 @@ class PositionUtil:
         # amt1 / (sqrt(cprice) - sqrt(lower))
         elif cprice <= upper:
             assert amt0 or amt1
-            l0 = math.inf
-            l1 = math.inf
-            if amt0:
-
+            sqrt_price = math.sqrt(cprice)
+            # single sided: only one liquidity to compute, no min to take
+            if not amt1:
                 l0 = int(
-                    amt0 * (math.sqrt(upper) * math.sqrt(cprice)) / (math.sqrt(upper) - math.sqrt(cprice))
+                    amt0 * (sqrt_upper * sqrt_price) / (sqrt_upper - sqrt_price)
                 )
-
-            if amt1:
+                return l0, amt0, int(l0 * (sqrt_price - sqrt_lower))
+            if not amt0:
                 l1 = int(
-                    amt1 / (math.sqrt(cprice) - math.sqrt(lower))
+                    amt1 / (sqrt_price - sqrt_lower)
                 )
+                return l1, int(l1 * (sqrt_upper - sqrt_price) / (sqrt_upper * sqrt_price)), amt1
+
+            l0 = int(
+                amt0 * (sqrt_upper * sqrt_price) / (sqrt_upper - sqrt_price)
+            )
+            l1 = int(
+                amt1 / (sqrt_price - sqrt_lower)
+            )
             if l0 < l1:
                 amt1 = int(
-                    l0 * (math.sqrt(cprice) - math.sqrt(lower))
+                    l0 * (sqrt_price - sqrt_lower)
                 )
                 return l0, amt0, amt1
             else:
                 amt0 = int(
-                    l1 * (math.sqrt(upper) - math.sqrt(cprice)) / (math.sqrt(upper) * math.sqrt(cprice))
+                    l1 * (sqrt_upper - sqrt_price) / (sqrt_upper * sqrt_price)
                 )
                 return l1, amt0, amt1
 
@@ -420,13 +734,167 @@ class PositionUtil:
         else:
             assert amt1, f"When upper({upper}) < cprice({cprice}), amt1 must bigger than 0"
             return int(
-                amt1 / (math.sqrt(upper) - math.sqrt(lower))
+                amt1 / (sqrt_upper - sqrt_lower)
             ), 0, amt1
 
     def __str__(self) -> str:
         return f"Position(L={self.liquidity}, tick=[{self.tick_lower}, {self.tick_upper}], range=[{self.cex_price_lower:.4f}, {self.cex_price_upper:.4f}])"
 
 
+@njit(cache=True)
+def _open_position_amounts_core(tick: int, tick_lower: int, tick_upper: int, amount0: float):
+    """Arithmetic of open_position_amounts on floats, wei sized values never pass through int64 when compiled."""
+    cprice = 1.0001 ** float(tick)
+    upper = 1.0001 ** float(tick_upper)
+    lower = 1.0001 ** float(tick_lower)
+    if cprice <= lower:
+        liquidity = np.trunc(amount0 * (math.sqrt(upper) * math.sqrt(lower) / (math.sqrt(upper) - math.sqrt(lower))))
+    elif cprice <= upper:
+        liquidity = np.trunc(amount0 * (math.sqrt(upper) * math.sqrt(cprice)) / (math.sqrt(upper) - math.sqrt(cprice)))
+    else:
+        raise ValueError("When upper < cprice, amount1 must bigger than 0")
+
+    low_price_sqrt = 1.0001 ** (tick_lower / 2)
+    high_price_sqrt = 1.0001 ** (tick_upper / 2)
+    high_price_sqrt_r = 1 / high_price_sqrt
+    if tick <= tick_lower:
+        amt0 = np.trunc(liquidity * (1 / low_price_sqrt - high_price_sqrt_r))
+        amt1 = 0.0
+    elif tick < tick_upper:
+        amt0 = np.trunc(liquidity * (1.0001 ** (-tick / 2) - high_price_sqrt_r))
+        amt1 = np.trunc(liquidity * (1.0001 ** (tick / 2) - low_price_sqrt))
+    else:
+        amt0 = 0.0
+        amt1 = np.trunc(liquidity * (high_price_sqrt - low_price_sqrt))
+    return liquidity, amt0, amt1
+
+
+def open_position_amounts(tick: int, tick_lower: int, tick_upper: int, amount0: int) -> Tuple[int, int, int]:
+    """Liquidity and token amounts of a position minted by amount0 at tick.
+
+    Same liquidity as `PositionUtil.cal_liquidity(1.0001**tick, 1.0001**tick_upper, 1.0001**tick_lower, amount0, None)`,
+    amounts are taken with plain 1.0001**(tick/2) edges. `PositionUtil.amount0_t` and `amount1_t` use the TickMath
+    edges instead, so they can differ from these in the last digits. The arithmetic is compiled by numba when it
+    is installed, which is why TickMath is not used here; it runs on floats and the results are converted to int
+    here, so amounts beyond int64 stay exact.
+
+    :param tick: current price tick
+    :type tick: int
+    :param tick_lower: low tick of the position
+    :type tick_lower: int
+    :param tick_upper: high tick of the position
+    :type tick_upper: int
+    :param amount0: amount of token0 to put
+    :type amount0: int
+    :return: Tuple[liquidity, amount0, amount1]
+    :rtype: Tuple[int, int, int]
+    """
+    liquidity, amt0, amt1 = _open_position_amounts_core(tick, tick_lower, tick_upper, float(amount0))
+    return int(liquidity), int(amt0), int(amt1)
+
+
+class PositionBook(object):
+    """Positions of one token pair stored column wise, so all of them are evaluated at a price
+    by a few array expressions instead of a loop over PositionUtil objects.
+
+    The columns are a snapshot: build a new book after liquidity of a position changes.
+    """
+
+    def __init__(self, positions: Iterable[PositionUtil]):
+        """
+        :param positions: positions sharing decimal0 and decimal1
+        :type positions: Iterable[PositionUtil]
+        """
+        self.positions = list(positions)
+        assert self.positions, "PositionBook needs at least one position"
+        assert len({p.decimals for p in self.positions}) == 1, "Positions must share decimal0 and decimal1"
+        first = self.positions[0]
+        self.factor, self.factor0, self.factor1 = float(first.factor), first.factor0, first.factor1
+        self.liquidity = np.array([float(p.liquidity) for p in self.positions])
+        self.low_price_sqrt = np.array([p.low_price_sqrt for p in self.positions])
+        self.high_price_sqrt = np.array([p.high_price_sqrt for p in self.positions])
+        self.high_price_sqrt_r = np.array([p.high_price_sqrt_r for p in self.positions])
+        self.amount0_edge = np.array([float(p._amount0_edge) for p in self.positions])
+        self.amount1_edge = np.array([float(p._amount1_edge) for p in self.positions])
+
+    def __len__(self):
+        return len(self.positions)
+
+    def qty0_all(self, price: float, reverted=False) -> np.ndarray:
+        """PositionUtil.qty0 of every position at one cex price
+
+        :param price: cex price
+        :type price: float
+        :param reverted: True if price=token1/token0, defaults to False
+        :type reverted: bool, optional
+        :return: qty0 of each position, same order as positions
+        :rtype: np.ndarray
+        """
+        if reverted:
+            price = 1 / price
+        psqrt = math.sqrt(price * self.factor)
+        res = np.trunc(self.liquidity * (1 / psqrt - self.high_price_sqrt_r))
+        amount0 = np.where(psqrt <= self.low_price_sqrt, self.amount0_edge, np.where(psqrt < self.high_price_sqrt, res, 0.0))
+        return amount0 * self.factor0
+
+    def qty1_all(self, price: float, reverted=False) -> np.ndarray:
+        """PositionUtil.qty1 of every position at one cex price
+
+        :param price: cex price
+        :type price: float
+        :param reverted: True if price=token1/token0, defaults to False
+        :type reverted: bool, optional
+        :return: qty1 of each position, same order as positions
+        :rtype: np.ndarray
+        """
+        if reverted:
+            price = 1 / price
+        psqrt = math.sqrt(price * self.factor)
+        res = np.trunc(self.liquidity * (psqrt - self.low_price_sqrt))
+        amount1 = np.where(psqrt <= self.low_price_sqrt, 0.0, np.where(psqrt < self.high_price_sqrt, res, self.amount1_edge))
+        return amount1 * self.factor1
+
+
+@njit(parallel=True, cache=True)
+def _qty_batch(
+    prices, factor, factor0, factor1, liquidity, low_price_sqrt, high_price_sqrt, high_price_sqrt_r,
+    amount0_edge, amount1_edge, out0, out1
+):
+    """Kernel of PositionUtil.qty_batch, amount0_psqrt/amount1_psqrt per price with int() truncation
+    done in float (no fastmath, results equal the scalar qty0/qty1)."""
+    for i in prange(len(prices)):
+        psqrt = math.sqrt(prices[i] * factor)
+        if psqrt <= low_price_sqrt:
+            out0[i] = amount0_edge * factor0
+            out1[i] = 0.0
+        elif psqrt < high_price_sqrt:
+            amount0 = liquidity * (1 / psqrt - high_price_sqrt_r)
+            amount1 = liquidity * (psqrt - low_price_sqrt)
+            out0[i] = np.trunc(amount0) * factor0
+            out1[i] = np.trunc(amount1) * factor1
+        else:
+            out0[i] = 0.0
+            out1[i] = amount1_edge * factor1
+
+
+@lru_cache(maxsize=1024)
+def format_timestamp(timestamp: int) -> str:
+    """Local time of a unix timestamp as printed in strategy logs, '%Y-%m-%d %H:%M:%S'."""
+    return time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(timestamp))
+
+
+class LazyTimestamp(object):
+    """Logging argument which only formats the timestamp when the record is emitted."""
+
+    __slots__ = ("timestamp",)
+
+    def __init__(self, timestamp: int):
+        self.timestamp = timestamp
+
+    def __str__(self):
+        return format_timestamp(self.timestamp)
+
+
 class PriceConverter(object):
     """Util for converting sqrtPriceX96 to readable cex price.
 
@@ -450,6 +918,8 @@ class PriceConverter(object):
     """
 
     X96FACTOR = 1 << 96
+    # int * 2**-96 rounds the same as int / 2**96 without the big int true division
+    X96FACTOR_INV = 1.0 / X96FACTOR
     
     def __init__(self, decimal0: int, decimal1: int):
         self.decimal0 = decimal0
@@ -458,15 +928,46 @@ class PriceConverter(object):
     
     def x96_to_price(self, x96, reverse: bool=False):
         if not reverse:
-            return  (int(x96)/(self.X96FACTOR))**2 / self.factor
+            return  (int(x96) * self.X96FACTOR_INV)**2 / self.factor
         else:
-            return self.factor / (int(x96)/(self.X96FACTOR))**2 
+            return self.factor / (int(x96) * self.X96FACTOR_INV)**2 
     
     def price_to_x96(self, price: float, reverse: bool=False):
         return int(math.sqrt(self.price_to_dex(price, reverse)) * self.X96FACTOR)
 
+    def x96_to_price_batch(self, x96: np.ndarray, reverse: bool=False) -> np.ndarray:
+        """x96_to_price of an array of sqrtPriceX96 (ints beyond int64 are fine as object arrays)
+
+        :param x96: sqrtPriceX96 values
+        :type x96: np.ndarray
+        :param reverse: True if price=token1/token0, defaults to False
+        :type reverse: bool, optional
+        :return: cex prices
+        :rtype: np.ndarray
+        """
+        psqrt = np.asarray(x96).astype(np.float64) / self.X96FACTOR
+        if not reverse:
+            return psqrt ** 2 / self.factor
+        else:
+            return self.factor / psqrt ** 2
+
+    def price_to_x96_batch(self, prices: np.ndarray, reverse: bool=False) -> np.ndarray:
+        """price_to_x96 of an array of cex prices, truncated to integers but kept as float64
+        since sqrtPriceX96 does not fit in int64; int() a value before passing it to a contract.
+
+        :param prices: cex prices
+        :type prices: np.ndarray
+        :param reverse: True if price=token1/token0, defaults to False
+        :type reverse: bool, optional
+        :return: sqrtPriceX96 values
+        :rtype: np.ndarray
+        """
+        prices = np.asarray(prices, dtype=np.float64)
+        dex_prices = self.factor / prices if reverse else prices * self.factor
+        return np.trunc(np.sqrt(dex_prices) * self.X96FACTOR)
+
     def x96_to_price_reverse(self, x96):
-        return self.factor / (int(x96)/(self.X96FACTOR))**2 
+        return self.factor / (int(x96) * self.X96FACTOR_INV)**2 
     
     def price_to_dex(self, price: float, reverse: bool=False):
         if not reverse:
@@ -474,8 +975,15 @@ class PriceConverter(object):
         else:
             return self.factor / price
         
-    def price_to_tick(self, price: float, reverse: bool=False):
-        return int(math.log(self.price_to_dex(price, reverse), 1.0001))
+    def price_to_tick(self, price: float, reverse: bool=False, exact: bool=False):
+        """Tick of a cex price, int() of the float log by default.
+
+        With exact=True the tick is resolved like the pool does (TickMath.getTickAtSqrtRatio on
+        price_to_x96), deterministic and floored, also for negative ticks.
+        """
+        if exact:
+            return get_tick_at_sqrt_ratio(self.price_to_x96(price, reverse))
+        return int(math.log(self.price_to_dex(price, reverse)) / LN_10001)
     
     def tick_to_price(self, tick: int, reverse: bool=False):
         if not reverse:
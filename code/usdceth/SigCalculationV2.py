@@ -5,6 +5,7 @@ Created on Tue Nov 16 15:43:07 2021
 @author: YS
 """
 
+import os
 import pandas as pd
 import pickle
 import talib as ta
@@ -12,8 +13,17 @@ from dateutil.parser import parse
 def load_obj(name):
     with open(name + '.pkl', 'rb') as f:
         return pickle.load(f)
-df_eth = load_obj('../../data/usdceth/symbolsData_2018032120211116_60min_v16_E')['60min']
-df_eth.columns= ['open','high','low','close','volume']
+
+def load_bars(name, freq):
+    # 只读取需要的频率，首次加载后缓存为parquet，之后不再反序列化整个pickle
+    path = f'{name}_{freq}.parquet'
+    if os.path.exists(path):
+        return pd.read_parquet(path)
+    bars = load_obj(name)[freq]
+    bars.columns= ['open','high','low','close','volume']
+    bars.to_parquet(path)
+    return bars
+df_eth = load_bars('../../data/usdceth/symbolsData_2018032120211116_60min_v16_E', '60min')
 df_eth = df_eth.loc['2018-03-22':'2021-11-09']
 df_eth.reset_index(inplace=True)
 df_eth.columns = ['datetime','open','high','low','close','volume']
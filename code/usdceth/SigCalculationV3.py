@@ -5,6 +5,7 @@ Created on Tue Nov 16 15:43:07 2021
 @author: YS
 """
 
+import os
 import pandas as pd
 import pickle
 import talib as ta
@@ -12,8 +13,17 @@ from dateutil.parser import parse
 def load_obj(name):
     with open(name + '.pkl', 'rb') as f:
         return pickle.load(f)
-df_eth = load_obj('../../data/usdceth/symbolsData_2018032120211116_60min_v16_E')['60min']
-df_eth.columns= ['open','high','low','close','volume']
+
+def load_bars(name, freq):
+    # 只读取需要的频率，首次加载后缓存为parquet，之后不再反序列化整个pickle
+    path = f'{name}_{freq}.parquet'
+    if os.path.exists(path):
+        return pd.read_parquet(path)
+    bars = load_obj(name)[freq]
+    bars.columns= ['open','high','low','close','volume']
+    bars.to_parquet(path)
+    return bars
+df_eth = load_bars('../../data/usdceth/symbolsData_2018032120211116_60min_v16_E', '60min')
 df_eth = df_eth.loc['2018-03-22':'2021-11-09']
 df_eth.reset_index(inplace=True)
 df_eth.columns = ['datetime','open','high','low','close','volume']
@@ -44,9 +54,9 @@ df_signal_tmp = df_eth_test_period[['datetime',
                                'CloseLowerMA',
                                'VolHigherOvermaQuantile50Twosigma',
                                'revoke_pos']]
-df_signal_tmp['timestamp'] = [0]*len(df_signal_tmp)
-df_signal_tmp['sqrtPriceX96'] = [0]*len(df_signal_tmp)
-df_signal_tmp['price'] = [0]*len(df_signal_tmp)
+df_signal_tmp['timestamp'] = 0
+df_signal_tmp['sqrtPriceX96'] = 0
+df_signal_tmp['price'] = 0
 
 df_signal_tmp = df_signal_tmp[['timestamp','sqrtPriceX96','price','datetime',
                  'SmaLowerLma',
@@ -57,13 +67,20 @@ df_signal_tmp = df_signal_tmp[['timestamp','sqrtPriceX96','price','datetime',
 df_signal_tmp['datetime_2'] = df_signal_tmp['datetime']
 df_signal_tmp = df_signal_tmp.set_index('datetime_2')
 df_signal_tmp = df_signal_tmp.resample('D').last()
-df_signal_tmp['datetime'] = [str(tmp)[:-6] for tmp in df_signal_tmp['datetime'].tolist()]
-df_signal_tmp['ind'] = [i for i in range(len(pricedata),len(pricedata)+len(df_signal_tmp))]
-df_signal_tmp.set_index('ind',inplace=True)
-pricedata_tmp = pricedata.append(df_signal_tmp)
-pricedata_tmp = pricedata_tmp.sort_values(by='datetime')
-pricedata_tmp = pricedata_tmp.fillna(method = 'ffill')
-pricedata_res = pricedata_tmp.loc[pricedata.index]
+#同str(tmp)[:-6]: 去掉+00:00时区后缀, 无数据的日期(NaT)为空字符串
+df_signal_tmp['datetime'] = df_signal_tmp['datetime'].dt.strftime('%Y-%m-%d %H:%M:%S').fillna('')
+#每个价格行取datetime不晚于它的最近一条信号(信号先前向填充), 与append+sort_values+ffill结果一致
+signal_columns = ['SmaLowerLma',
+                  'VolLowerBelowmaQuantile50',
+                  'CloseLowerMA',
+                  'VolHigherOvermaQuantile50Twosigma',
+                  'revoke_pos']
+signals = df_signal_tmp.loc[df_signal_tmp['datetime'] != '', ['datetime'] + signal_columns].ffill()
+signals['key'] = pd.to_datetime(signals.pop('datetime'))
+prices = pricedata.assign(key=pd.to_datetime(pricedata['datetime'])).sort_values('key')
+pricedata_res = pd.merge_asof(prices, signals, on='key')
+pricedata_res.index = prices.index
+pricedata_res = pricedata_res.loc[pricedata.index].drop(columns='key')
 pricedata_res.set_index('datetime',inplace=True)
 pricedata_res.to_csv('../../data/usdceth/pricedata_res2021051020211110v3.csv',index=True)
 
@@ -3,7 +3,10 @@ from univ3api.simulation import PoolSimiulation, PositionInstance, PoolFee
 import univ3api.utils as utils
 import numpy as np
 from datetime import datetime
-import time
+import logging
+
+log = logging.getLogger(__name__)
+
 
 class HoldStrategy(PoolSimiulation):
     def __init__(self, amount0: int, amount1: int, decimal0: int, decimal1: int, fee: PoolFee, price_reverse: bool=False) -> None:
@@ -14,12 +17,17 @@ class HoldStrategy(PoolSimiulation):
         self.mint_timestamp = 0
         self.factor0 = 10**self.decimal0
         self.factor1 = 10**self.decimal1
+        self._inv_factor0 = 1.0/self.factor0
+        self._inv_factor1 = 1.0/self.factor1
         self.pc = utils.PriceConverter(6, 18)
         self.open_pos_times = 0
         self.long_pos = False
         self.short_pos = False
         self.day_length = 30
 
+    def plain_amounts(self, amt0, amt1):
+        return amt0*self._inv_factor0, amt1*self._inv_factor1
+
     def price_in_range(self, price):
         return self.lower_price < price < self.upper_price
 
@@ -44,20 +52,20 @@ class HoldStrategy(PoolSimiulation):
         # if CloseLowerMA==1 and SmaLowerLma==1  and not self.position_id:
             self.open_pos_times += 1
             self.short_pos = True
-            print(f'**********************【Price Below MA】【创建Short Vol池子】【第{self.open_pos_times}次建池】***********************************')
+            log.info('**********************【Price Below MA】【创建Short Vol池子】【第%s次建池】***********************************', self.open_pos_times)
             # self.upper_price = price*(1 + 4*0.026427*sqrt(self.day_length))
             # self.lower_price = price*(1 - 4*0.026427*sqrt(self.day_length))
             self.upper_price = price*(1 + 1)
             self.lower_price = price*(1 - 0.999)
             self.swap(0, pct=0.85)   #部分usdc换成eth
-            print('转换后钱包中余额','amount0: ', self.amount0, 'amount1: ',self.amount1)
-            print("price: ", price)
+            log.info('转换后钱包中余额 amount0: %s amount1: %s', self.amount0, self.amount1)
+            log.info("price: %s", price)
             tick = self.pc.price_to_tick(price)
             upperTick = self.pc.price_to_tick(self.upper_price)
             lowerTick = self.pc.price_to_tick(self.lower_price)
             # (1)
-            print('$$$$$$$【Upper Price】:', self.upper_price)
-            print('$$$$$$$【Lower Price】:', self.lower_price)
+            log.info('$$$$$$$【Upper Price】: %s', self.upper_price)
+            log.info('$$$$$$$【Lower Price】: %s', self.lower_price)
             
             if self.price_in_range(price):
                 upper_tick, lower_tick = self.cal_tick(upperTick, lowerTick)
@@ -70,32 +78,22 @@ class HoldStrategy(PoolSimiulation):
                                     amt1=None
                                 )
                 # print('######:', L, amount0, amount1)
-                print('######【L】:{}【USDC】:{}【ETH】:{}'.format( L, amount0, amount1))
-                pu = utils.PositionUtil(
-                                        L,
-                                        tick_lower=lower_tick,
-                                        tick_upper=upper_tick,
-                                        decimal0=6, ########注意币种转换区分########
-                                        decimal1=18 ########注意币种转换区分########
-                                        )
-                t0 = pu.amount0_t(tick)
-                t1 = pu.amount1_t(tick)
+                log.info('######【L】:%s【USDC】:%s【ETH】:%s', L, amount0, amount1)
+                t0, t1 = utils.PositionUtil.amounts_t(L, tick, lower_tick, upper_tick)
                 # self.amount0 = t0
                 # self.amount1 = t1
 
-                print('将要投入池子的数量','amount_t0:', t0, 'amount_t1:', t1)
+                log.info('将要投入池子的数量 amount_t0: %s amount_t1: %s', t0, t1)
                 # print('$$$$$$$$$$$$$$$$', self.amount1-t1)
                 position, amt0, amt1 = self.mint(
                     lower_tick, upper_tick,
                     int(t0), int(t1)
                 )
                 self.position_id = position.token_id
-                time_to_print = time.localtime(self.timestamp)
-                time_to_print = time.strftime('%Y-%m-%d %H:%M:%S', time_to_print)
-                print(f"【RealWorldTime】:{time_to_print}, Timestamp: {self.timestamp}, Blocknumber: {self.block_number}")
-                print(f"Mint position： {position}")
-                print(f"【Mint amount】: token0={amt0/self.factor0}, token1={amt1/self.factor1}")
-                print(f"Wallet amount: token0={self.amount0/self.factor0}, token1={self.amount1/self.factor1}")
+                log.info("【RealWorldTime】:%s, Timestamp: %s, Blocknumber: %s", utils.LazyTimestamp(self.timestamp), self.timestamp, self.block_number)
+                log.info("Mint position： %s", position)
+                log.info("【Mint amount】: token0=%s, token1=%s", *self.plain_amounts(amt0, amt1))
+                log.info("Wallet amount: token0=%s, token1=%s", *self.plain_amounts(self.amount0, self.amount1))
                 self.mint_price = price
                 self.mint_timestamp = ts
                 return
@@ -240,7 +238,7 @@ class HoldStrategy(PoolSimiulation):
         #     self.position_id = None
         #     self.increased = False
 
-        #     token1 = self.amount1/self.factor1
+        #     token1 = self.amount1*self._inv_factor1
         #     if token1 > 0.05: #如果钱包里的eth多于0.05，则将eth全都换成usdc
         #         self.swap(1,pct=0.95)
         #     print(f"撤池后经转换 Wallet amount: token0={self.amount0/self.factor0}, token1={self.amount1/self.factor1}")
@@ -264,7 +262,7 @@ class HoldStrategy(PoolSimiulation):
         #     self.position_id = None
         #     self.increased = False
 
-        #     token1 = self.amount1/self.factor1
+        #     token1 = self.amount1*self._inv_factor1
         #     if token1 > 0.05: #如果钱包里的eth多于0.05，则将eth全都换成usdc
         #         self.swap(1,pct=0.95)
         #     print(f"撤池后经转换 Wallet amount: token0={self.amount0/self.factor0}, token1={self.amount1/self.factor1}")
@@ -287,7 +285,7 @@ class HoldStrategy(PoolSimiulation):
         #     self.position_id = None
         #     self.increased = False
 
-        #     token1 = self.amount1/self.factor1
+        #     token1 = self.amount1*self._inv_factor1
         #     if token1 > 0.05: #如果钱包里的eth多于0.05，则将eth全都换成usdc
         #         self.swap(1,pct=0.95)
         #     print(f"撤池后经转换 Wallet amount: token0={self.amount0/self.factor0}, token1={self.amount1/self.factor1}")
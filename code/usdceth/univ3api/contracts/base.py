@@ -1,47 +1,236 @@
+from hexbytes.main import HexBytes
 from web3 import Web3
 import web3
 from web3.contract import Contract, ContractFunction
-from typing import Optional, Union
+from web3.datastructures import AttributeDict
+from web3._utils.method_formatters import receipt_formatter
+from web3._utils.events import get_event_data
+from web3.exceptions import InvalidEventABI, LogTopicError, MismatchedABI
+from eth_utils import event_abi_to_log_topic
+from typing import List, Optional, Tuple
+from concurrent.futures import ThreadPoolExecutor
 import logging
+import threading
+import weakref
+
+
+# providers whose node answered eth_sendRawTransactionSync with "method not found"
+_NO_SYNC_SEND = weakref.WeakSet()
+METHOD_NOT_FOUND = -32601
+# EIP-7966 error of eth_sendRawTransactionSync: the transaction is in the mempool but not mined within the timeout
+SYNC_SEND_TIMEOUT = 4
+
+# next nonce per (chain id, sender address), shared by every contract wrapper of the process
+_NONCES = {}
+_NONCE_LOCK = threading.Lock()
+
+
+def decode_receipt_events(receipt, events: list) -> list:
+    """Same as chaining event.processReceipt(receipt) for every event, but one pass over the logs.
+
+    Logs are only decoded against the events sharing their topic0; the ones that still do not
+    fit (e.g. an ERC20 Transfer for the ERC721 Transfer event) are skipped like processReceipt does.
+    """
+    abis = [event._get_event_abi() for event in events]
+    by_topic = {}
+    for i, abi in enumerate(abis):
+        by_topic.setdefault(bytes(event_abi_to_log_topic(abi)), []).append(i)
+
+    decoded: List[list] = [[] for _ in events]
+    for log in receipt["logs"]:
+        if not log["topics"]:
+            continue
+        for i in by_topic.get(bytes(log["topics"][0]), ()):
+            try:
+                decoded[i].append(get_event_data(events[i].web3.codec, abis[i], log))
+            except (MismatchedABI, LogTopicError, InvalidEventABI, TypeError):
+                continue
+    return [log for logs in decoded for log in logs]
 
 
 class BaseLocalContractAPI(object):
 
+    # set True on an instance to send awaited transactions with eth_sendRawTransactionSync (EIP-7966),
+    # only for nodes known to support it: others may reject the method in ways that are not -32601
+    sync_send = False
+
     def __init__(self, api: Web3, contract: Contract, account: web3.Account):
         self.api = api
         self.contract = contract
         self.account = account
         self.api.eth.default_account = account.address
+        self._chain_id: int = 0
+
+    def chain_id(self) -> int:
+        if not self._chain_id:
+            self._chain_id = self.api.eth.chain_id
+        return self._chain_id
+
+    def _ensure_fee_params(self, trx_params: dict) -> dict:
+        """trx_params with chainId and EIP-1559 fees filled in, so buildTransaction only estimates gas.
+
+        chainId comes from the cached chain_id(). Unless the caller set gasPrice or any fee, or a gas
+        price strategy is set on the Web3 instance, the fees come from one eth_feeHistory request
+        instead of buildTransaction's eth_maxPriorityFeePerGas plus latest block: the median priority
+        fee of the last block and twice the next base fee.
+        """
+        trx_params = dict(trx_params)
+        trx_params.setdefault("chainId", self.chain_id())
+        if {"gasPrice", "maxFeePerGas", "maxPriorityFeePerGas"} & trx_params.keys():
+            return trx_params
+        eth = self.api.eth
+        if getattr(eth, "gas_price_strategy", None) or getattr(eth, "gasPriceStrategy", None):
+            # buildTransaction prices it with the strategy
+            return trx_params
+        try:
+            history = eth.fee_history(1, "latest", [50])
+        except ValueError:
+            # node without eth_feeHistory, leave the fees to buildTransaction
+            return trx_params
+        # pre-London chains and some nodes answer without base fees or rewards, buildTransaction decides then
+        base_fees = history.get("baseFeePerGas")
+        rewards = history.get("reward")
+        if base_fees and rewards and rewards[0]:
+            priority_fee = rewards[0][0]
+            trx_params["maxPriorityFeePerGas"] = priority_fee
+            trx_params["maxFeePerGas"] = 2 * base_fees[-1] + priority_fee
+        return trx_params
     
-    def send_transaction(self, function: ContractFunction, trx_params: Optional[dict]=None):
-        if "nonce" not in trx_params:
-            count = self.api.eth.get_transaction_count(self.account.address)
-            trx_params["nonce"] = count
-        trx = function.buildTransaction(trx_params)
-        signed_tx = self.account.sign_transaction(trx)
-        tx_hash = self.api.eth.send_raw_transaction(signed_tx.rawTransaction)
-        logging.info(f"transaction hash: {tx_hash}")
-        self.api.eth.wait_for_transaction_receipt(tx_hash)
+    def send_transaction(self, function: ContractFunction, trx_params: Optional[dict]=None, await_receipt: bool=True):
+        """Sign and send function as a transaction of self.account.
+
+        :param await_receipt: wait until mined and return (transaction, receipt), otherwise
+            return (tx_hash, None) right after sending, defaults to True
+        :type await_receipt: bool, optional
+        """
+        # never modify the caller's params, they may be a shared template
+        trx_params = dict(trx_params) if trx_params else {}
+        local_nonce = "nonce" not in trx_params
+        if local_nonce:
+            trx_params["nonce"] = self.next_nonce()
+        try:
+            trx = function.buildTransaction(self._ensure_fee_params(trx_params))
+            signed_tx = self.account.sign_transaction(trx)
+            sent = False
+            if await_receipt and self.sync_send and self.api.provider not in _NO_SYNC_SEND:
+                sent, receipt = self.send_raw_transaction_sync(signed_tx.rawTransaction)
+                if receipt is not None:
+                    logging.info("transaction hash: %s", receipt.transactionHash)
+                    return self.api.eth.get_transaction(receipt.transactionHash), receipt
+            if sent:
+                # timed out in the mempool, wait for it below instead of sending it again
+                tx_hash = signed_tx.hash
+            else:
+                tx_hash = self.api.eth.send_raw_transaction(signed_tx.rawTransaction)
+        except Exception:
+            # the nonce may not have been used, read it from the node next time
+            if local_nonce:
+                self.reset_nonce()
+            raise
+        logging.info("transaction hash: %s", tx_hash)
+        if not await_receipt:
+            return tx_hash, None
+        receipt = self.api.eth.wait_for_transaction_receipt(tx_hash)
         trx = self.api.eth.get_transaction(tx_hash)
-        receipt = self.api.eth.get_transaction_receipt(tx_hash)
         return trx, receipt
     
+    def next_nonce(self, count: int=1) -> int:
+        """Nonce for the next transaction of self.account, counted locally after the first one.
+
+        :param count: reserve this many consecutive nonces, defaults to 1
+        :type count: int, optional
+        :return: the first reserved nonce
+        :rtype: int
+        """
+        address = self.account.address
+        key = (self.chain_id(), address)
+        with _NONCE_LOCK:
+            if key not in _NONCES:
+                _NONCES[key] = self.api.eth.get_transaction_count(address, "pending")
+            nonce = _NONCES[key]
+            _NONCES[key] = nonce + count
+        return nonce
+
+    def send_many(
+        self, functions: List[ContractFunction], trx_params_list: Optional[List[dict]]=None, max_workers: int=16
+        ) -> List[Tuple]:
+        """Send independent transactions concurrently with consecutive nonces.
+
+        :param trx_params_list: trx_params of each function, defaults to None (no params)
+        :type trx_params_list: Optional[List[dict]], optional
+        :param max_workers: threads building, signing and waiting, defaults to 16
+        :type max_workers: int, optional
+        :return: (transaction, receipt) of each function, in order
+        :rtype: List[Tuple]
+        """
+        trx_params_list = trx_params_list or [{} for _ in functions]
+        first = self.next_nonce(len(functions))
+        trx_params_list = [
+            dict(trx_params, nonce=first + i) for i, trx_params in enumerate(trx_params_list)
+        ]
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            try:
+                tx_hashes = list(executor.map(
+                    lambda function, trx_params: self.send_transaction(function, trx_params, await_receipt=False)[0],
+                    functions, trx_params_list
+                ))
+            except Exception:
+                # a gap in the reserved nonces blocks the later ones, read it from the node next time
+                self.reset_nonce()
+                raise
+            receipts = list(executor.map(self.api.eth.wait_for_transaction_receipt, tx_hashes))
+            transactions = list(executor.map(self.api.eth.get_transaction, tx_hashes))
+        return list(zip(transactions, receipts))
+
+    def reset_nonce(self):
+        """Forget the local nonce of self.account, e.g. after a failed send or a transaction sent elsewhere."""
+        with _NONCE_LOCK:
+            _NONCES.pop((self.chain_id(), self.account.address), None)
+
+    def send_raw_transaction_sync(self, raw_transaction: bytes) -> Tuple[bool, Optional[AttributeDict]]:
+        """Send and wait for the receipt in one eth_sendRawTransactionSync request.
+
+        :return: (sent, receipt): (True, receipt) once mined, (True, None) if the node timed out
+            waiting for it (the transaction is in the mempool), (False, None) if the node does not
+            support the method (the transaction is not sent)
+        :rtype: Tuple[bool, Optional[AttributeDict]]
+        """
+        response = self.api.provider.make_request("eth_sendRawTransactionSync", [HexBytes(raw_transaction).hex()])
+        if "error" in response:
+            error = response["error"]
+            if error.get("code") == METHOD_NOT_FOUND:
+                _NO_SYNC_SEND.add(self.api.provider)
+                return False, None
+            if error.get("code") == SYNC_SEND_TIMEOUT:
+                return True, None
+            raise ValueError(error)
+        return True, AttributeDict.recursive(receipt_formatter(response["result"]))
+
     def transact_with_return(
         self, function: ContractFunction, 
         trx_params: Optional[dict]=None, 
         events: Optional[list]=None,
-        call_before_transaction=True,
+        call_before_transaction: bool=True,
+        await_receipt: bool=True,
         ):
+        """Send function and decode events from its receipt.
+
+        :param call_before_transaction: eth_call function first and return its result as
+            "call_result", defaults to True. Pass False to save the request when the decoded
+            events are enough, buildTransaction still fails on a revert while estimating gas
+        :type call_before_transaction: bool, optional
+        """
+        trx_params = dict(trx_params) if trx_params else {}
         if call_before_transaction:
             call_result = function.call(trx_params)
         else:
             call_result = None
 
-        t, r = self.send_transaction(function, trx_params)
+        t, r = self.send_transaction(function, trx_params, await_receipt)
         logs = []
-        if events:
-            for event in events:
-                logs.extend(event.processReceipt(r))
+        # without a receipt "transaction" holds the hash, events can be read from the receipt later
+        if events and r is not None:
+            logs = decode_receipt_events(r, events)
         return {
             "trx_send": True,
             "transaction": t,
@@ -1,7 +1,8 @@
 import math
 import os
 import json
-from typing import Optional
+import weakref
+from typing import List, Optional, Tuple
 from datetime import datetime
 from eth_typing.encoding import HexStr
 from hexbytes.main import HexBytes
@@ -9,6 +10,7 @@ from univ3api.contracts.base import BaseLocalContractAPI
 from web3 import Web3
 import web3
 from univ3api.contracts.enums import PoolFee
+from univ3api.contracts.multicall import Multicall3
 
 
 ABI_FILE = "UniswapV3Factory.json"
@@ -21,11 +23,33 @@ def get_abi():
         return json.load(f)["abi"]
 
 
+_ABI = get_abi()
+# bound factory contract per Web3 instance
+_CONTRACTS = weakref.WeakKeyDictionary()
+
+
 class UniswapV3Factory(BaseLocalContractAPI):
 
     def __init__(self, api: Web3, account: web3.Account):
-        contract = api.eth.contract(CONTRACT_ADDRESS, abi=get_abi())
+        # the factory address is fixed, so the bound contract is shared per Web3 instance
+        contract = _CONTRACTS.get(api)
+        if contract is None:
+            contract = _CONTRACTS[api] = api.eth.contract(CONTRACT_ADDRESS, abi=_ABI)
         super().__init__(api, contract, account)
 
     def get_pool(self, token0: str, token1: str, fee: PoolFee) -> HexStr:
-        return self.contract.functions.getPool(token0, token1, fee.value).call()
\ No newline at end of file
+        return self.contract.functions.getPool(token0, token1, fee.value).call()
+
+    def get_pools(self, pairs: List[Tuple[str, str, PoolFee]]) -> List[HexStr]:
+        """Same as get_pool for every (token0, token1, fee), in one rpc round trip.
+
+        :param pairs: list of (token0, token1, fee)
+        :type pairs: List[Tuple[str, str, PoolFee]]
+        :return: pool addresses
+        :rtype: List[HexStr]
+        """
+        functions = [
+            self.contract.functions.getPool(token0, token1, fee.value)
+            for token0, token1, fee in pairs
+        ]
+        return Multicall3(self.api, self.account).aggregate(functions)
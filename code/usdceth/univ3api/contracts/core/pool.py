@@ -1,13 +1,15 @@
 import math
 import os
 import json
-from typing import Optional
+import weakref
+from typing import List, Optional
 from datetime import datetime
 from hexbytes.main import HexBytes
 from univ3api.contracts.base import BaseLocalContractAPI
 from web3 import Web3
 import web3
 from univ3api.contracts.enums import PoolFee
+from univ3api.contracts.multicall import Multicall3
 
 
 ABI_FILE = "UniswapV3Pool.json"
@@ -19,11 +21,37 @@ def get_abi():
         return json.load(f)["abi"]
 
 
+_ABI = get_abi()
+# pool contract class per Web3 instance
+_POOL_FACTORIES = weakref.WeakKeyDictionary()
+
+
+def get_pool_factory(api: Web3):
+    """Pool contract class built once per Web3 instance, bind an address with `factory(address=...)`."""
+    factory = _POOL_FACTORIES.get(api)
+    if factory is None:
+        factory = _POOL_FACTORIES[api] = api.eth.contract(abi=_ABI)
+    return factory
+
+
 class UniswapV3Pool(BaseLocalContractAPI):
 
     def __init__(self, contract_address: str, api: Web3, account: web3.Account):
-        contract = api.eth.contract(contract_address, abi=get_abi())
+        contract = get_pool_factory(api)(address=contract_address)
         super().__init__(api, contract, account)
 
     def slot0(self):
-        return self.contract.functions.slot0().call()
\ No newline at end of file
+        return self.contract.functions.slot0().call()
+
+    @classmethod
+    def slot0_many(cls, pool_addrs: List[str], api: Web3, account: web3.Account) -> list:
+        """slot0 of every pool in pool_addrs, in one rpc round trip.
+
+        :param pool_addrs: pool addresses
+        :type pool_addrs: List[str]
+        :return: slot0 of each pool, same order as pool_addrs
+        :rtype: list
+        """
+        factory = get_pool_factory(api)
+        functions = [factory(address=address).functions.slot0() for address in pool_addrs]
+        return Multicall3(api, account).aggregate(functions)
@@ -5,4 +5,16 @@ class PoolFee(Enum):
 
     low = 500
     medium = 3000
-    high = 10000
\ No newline at end of file
+    high = 10000
+
+    @property
+    def tick_spacing(self) -> int:
+        """tickSpacing enabled for this fee by UniswapV3Factory"""
+        return TICK_SPACING[self.value]
+
+
+TICK_SPACING = {
+    500: 10,
+    3000: 60,
+    10000: 200,
+}
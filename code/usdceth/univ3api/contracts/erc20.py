@@ -1,9 +1,12 @@
 import os
 import json
-from typing import Optional
+import weakref
+from typing import Dict, List, Optional
 from datetime import datetime
 from hexbytes.main import HexBytes
 from univ3api.contracts.base import BaseLocalContractAPI
+from univ3api.contracts import cache
+from univ3api.contracts.multicall import Multicall3
 from web3 import Web3
 import web3
 from univ3api.contracts.enums import PoolFee
@@ -18,22 +21,152 @@ def get_abi():
         return json.load(f)["abi"]
 
 
+_ABI = get_abi()
+# (ERC20 contract class, {token_address: bound contract}) per Web3 instance
+_TOKEN_CONTRACTS = weakref.WeakKeyDictionary()
+
+
+def get_token_contract(api: Web3, token_address: str):
+    """ERC20 contract of token_address, shared by every ERC20Token of the same Web3 instance."""
+    entry = _TOKEN_CONTRACTS.get(api)
+    if entry is None:
+        entry = _TOKEN_CONTRACTS[api] = (api.eth.contract(abi=_ABI), {})
+    factory, contracts = entry
+    contract = contracts.get(token_address)
+    if contract is None:
+        contract = contracts[token_address] = factory(address=token_address)
+    return contract
+
+
+def bulk_decimals(
+    api: Web3, account: web3.Account, token_addresses: List[str],
+    chain_id: Optional[int]=None, multicall3: Optional[Multicall3]=None
+) -> List[int]:
+    """decimals of many tokens, the ones not cached read in a single Multicall3 eth_call.
+
+    :param token_addresses: checksum addresses of the tokens
+    :type token_addresses: List[str]
+    :param chain_id: when given, decimals are read from and stored to univ3api.contracts.cache, defaults to None
+    :type chain_id: Optional[int], optional
+    :param multicall3: Multicall3 wrapper to batch with, defaults to None (a new one)
+    :type multicall3: Optional[Multicall3], optional
+    :return: decimals in the order of token_addresses
+    :rtype: List[int]
+    """
+    tokens = [ERC20Token(address, api, account, chain_id) for address in token_addresses]
+    missing = [token for token in tokens if not token.has_decimals()]
+    if missing:
+        multicall3 = multicall3 or Multicall3(api, account)
+        results = multicall3.aggregate([token.contract.functions.decimals() for token in missing])
+        for token, decimals in zip(missing, results):
+            token.set_decimals(decimals)
+    return [token.decimals() for token in tokens]
+
+
 class ERC20Token(BaseLocalContractAPI):
 
-    def __init__(self, token_address: str, api: Web3, account: web3.Account):
-        contract = api.eth.contract(token_address, abi=get_abi())
+    def __init__(self, token_address: str, api: Web3, account: web3.Account, chain_id: Optional[int]=None):
+        """
+        :param chain_id: when given, decimals(), symbol() and name() are persisted by univ3api.contracts.cache, defaults to None
+        :type chain_id: Optional[int], optional
+        """
+        contract = get_token_contract(api, token_address)
         super().__init__(api, contract, account)
+        self._cache_chain_id = chain_id
         self._decimals = 0
         self._decimals_called = False
+        self._metadata = {}
+        self._functions = {}
 
     def call(self, func_name: str, *args, **trx_params):
-        return self.contract.get_function_by_name(func_name)(*args).call(trx_params)
+        function = self._functions.get(func_name)
+        if function is None:
+            # get_function_by_name scans the abi every time
+            function = self._functions[func_name] = self.contract.get_function_by_name(func_name)
+        return function(*args).call(trx_params)
     
+    def _metadata_key(self, func_name: str) -> tuple:
+        return (func_name, self._cache_chain_id, self.contract.address.lower())
+
+    def _decimals_key(self) -> tuple:
+        return self._metadata_key("decimals")
+
+    def _immutable_call(self, func_name: str):
+        """Result of a view that never changes for the token, e.g. symbol"""
+        if func_name not in self._metadata:
+            if self._cache_chain_id is None:
+                self._metadata[func_name] = self.call(func_name)
+            else:
+                self._metadata[func_name] = cache.cached_lookup(self._metadata_key(func_name), lambda: self.call(func_name))
+        return self._metadata[func_name]
+
+    def symbol(self) -> str:
+        return self._immutable_call("symbol")
+
+    def name(self) -> str:
+        return self._immutable_call("name")
+
     def decimals(self):
         if self._decimals_called:
             return self._decimals
         else:
-            self._decimals = self.call("decimals")
+            if self._cache_chain_id is None:
+                self._decimals = self.call("decimals")
+            else:
+                self._decimals = cache.cached_lookup(self._decimals_key(), lambda: self.call("decimals"))
             self._decimals_called = True
             return self._decimals
+
+    def load_metadata(self, multicall3: Optional[Multicall3]=None) -> Dict:
+        """decimals, symbol, name and totalSupply, the ones not cached yet read in a single eth_call.
+
+        :param multicall3: Multicall3 wrapper to batch with, defaults to None (a new one)
+        :type multicall3: Optional[Multicall3], optional
+        :return: {"decimals": int, "symbol": str, "name": str, "totalSupply": int}
+        :rtype: Dict
+        """
+        missing = ["totalSupply"]
+        if not self.has_decimals():
+            missing.append("decimals")
+        for func_name in ("symbol", "name"):
+            if func_name not in self._metadata and self._cache_chain_id is not None:
+                value = cache.peek(self._metadata_key(func_name))
+                if value is not None:
+                    self._metadata[func_name] = value
+            if func_name not in self._metadata:
+                missing.append(func_name)
+
+        multicall3 = multicall3 or Multicall3(self.api, self.account)
+        results = dict(zip(missing, multicall3.aggregate(
+            [self.contract.get_function_by_name(func_name)() for func_name in missing]
+        )))
+        if "decimals" in results:
+            self.set_decimals(results["decimals"])
+        for func_name in ("symbol", "name"):
+            if func_name in results:
+                self._metadata[func_name] = results[func_name]
+                if self._cache_chain_id is not None:
+                    cache.store(self._metadata_key(func_name), results[func_name])
+        return {
+            "decimals": self._decimals,
+            "symbol": self._metadata["symbol"],
+            "name": self._metadata["name"],
+            "totalSupply": results["totalSupply"],
+        }
+
+    def has_decimals(self) -> bool:
+        """True if decimals() is known without an rpc call"""
+        if not self._decimals_called and self._cache_chain_id is not None:
+            decimals = cache.peek(self._decimals_key())
+            if decimals is not None:
+                self._decimals = decimals
+                self._decimals_called = True
+        return self._decimals_called
+
+    def set_decimals(self, decimals: int):
+        """Set decimals() read elsewhere, e.g. in a multicall batch"""
+        self._decimals = decimals
+        self._decimals_called = True
+        if self._cache_chain_id is not None:
+            cache.store(self._decimals_key(), decimals)
     
\ No newline at end of file
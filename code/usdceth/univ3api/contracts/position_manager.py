@@ -1,19 +1,25 @@
 
+from collections import namedtuple
 from enum import Enum
 import math
+import numpy as np
 import os
 import json
 import posixpath
-from typing import Optional, Tuple, Union
-from datetime import datetime
+from typing import Dict, List, Optional, Tuple, Union
+import time
 from univ3api.contracts.erc20 import ERC20Token
 from hexbytes.main import HexBytes
 from univ3api.contracts.base import BaseLocalContractAPI
-from web3 import Web3, contract
+from web3 import Web3
+from web3.contract import ContractFunction
 import web3
 from univ3api.contracts.enums import PoolFee
 from univ3api.contracts.core.factory import UniswapV3Factory
 from univ3api.contracts.core.pool import UniswapV3Pool
+from univ3api.contracts.cache import cached_lookup
+from univ3api.contracts.multicall import Multicall3, decode_call_result, encode_call
+from univ3api.utils import LN_10001, njit, sqrt_price_at_tick
 
 
 ABI_FILE = "NonfungiblePositionManager.json"
@@ -29,6 +35,87 @@ def get_abi():
         return json.load(f)["abi"]
 
 
+_ABI = get_abi()
+
+_PositionFields = namedtuple("_PositionFields", [
+    "nonce",
+    "operator",
+    "token0",
+    "token1",
+    "fee",
+    "tickLower",
+    "tickUpper",
+    "liquidity",
+    "feeGrowthInside0LastX128",
+    "feeGrowthInside1LastX128",
+    "tokensOwed0",
+    "tokensOwed1"
+])
+
+
+class Position(_PositionFields):
+    """Return value of positions(), fields in the order of INonfungiblePositionManager.positions.
+
+    Also readable like the dict positions() used to return: position["liquidity"], dict(position).
+    """
+    __slots__ = ()
+
+    def __getitem__(self, key):
+        if isinstance(key, str):
+            try:
+                return getattr(self, key)
+            except AttributeError:
+                raise KeyError(key) from None
+        return super().__getitem__(key)
+
+    def keys(self) -> Tuple[str, ...]:
+        return self._fields
+
+
+def position_tokens(position: Union[Position, dict]) -> Tuple[str, str]:
+    """(token0, token1) of a Position or of a position dict"""
+    if isinstance(position, Position):
+        return position.token0, position.token1
+    return position["token0"], position["token1"]
+
+
+@njit(cache=True)
+def _trunc(x: float) -> float:
+    # math.fmod is not supported by numba, np.trunc is and keeps the float
+    return np.trunc(x)
+
+
+@njit(cache=True)
+def _cal_liquidity_core(cprice: float, upper: float, lower: float, amt0: float, amt1: float):
+    """Arithmetic of NonfungiblePositionManager.cal_liquidity on floats, 0 for a missing amount.
+
+    Amounts stay float so wei sized values never pass through int64 when compiled;
+    int() truncation is done by _trunc, the caller converts to int.
+
+    :return: Tuple[liquidity, computed amount of the other token (0 in case 1 and 3)]
+    :rtype: Tuple[float, float]
+    """
+    sqrt_upper = math.sqrt(upper)
+    sqrt_lower = math.sqrt(lower)
+    if cprice <= lower:
+        return _trunc(amt0 * (sqrt_upper*sqrt_lower/(sqrt_upper-sqrt_lower))), 0.0
+    elif cprice <= upper:
+        sqrt_price = math.sqrt(cprice)
+        if amt0:
+            liquidity = _trunc(amt0 * (sqrt_upper * sqrt_price) / (sqrt_upper - sqrt_price))
+            return liquidity, _trunc(liquidity * (sqrt_price - sqrt_lower))
+        else:
+            liquidity = _trunc(amt1 / (sqrt_price - sqrt_lower))
+            return liquidity, _trunc(liquidity * (sqrt_upper - sqrt_price) / (sqrt_upper * sqrt_price))
+    else:
+        return _trunc(amt1 / (sqrt_upper - sqrt_lower)), 0.0
+
+
+@njit(cache=True)
+def _price_to_tick_core(price: float) -> float:
+    return math.log(price) / LN_10001
+
+
 class NonfungiblePositionManager(BaseLocalContractAPI): 
     
     def __init__(self, api: Web3, account: web3.Account):
@@ -41,21 +128,48 @@ class NonfungiblePositionManager(BaseLocalContractAPI):
         :param account: web3.Account object
         :type account: web3.Account
         """
-        contract = api.eth.contract(CONTRACT_ADDRESS, abi=get_abi())
+        contract = api.eth.contract(CONTRACT_ADDRESS, abi=_ABI)
         super().__init__(api, contract, account)
         self._weth9: str = ""
+        self._weth9_bytes: bytes = b""
         self.default_deadline=60
         self.call_only = False
         self.pool_contracts = {}
         self.erc20_token_contracts = {}
         self.factory_contract = UniswapV3Factory(self.api, self.account)
+        self.multicall3 = Multicall3(self.api, self.account)
+        # contract functions used on every operation, looked up once
+        functions = self.contract.functions
+        self._fn_positions = functions.positions
+        self._fn_collect = functions.collect
+        self._fn_decrease_liquidity = functions.decreaseLiquidity
+        self._fn_increase_liquidity = functions.increaseLiquidity
+        self._fn_mint = functions.mint
+        self._fn_multicall = functions.multicall
+        self._fn_sweep_token = functions.sweepToken
+        self._fn_token_of_owner_by_index = functions.tokenOfOwnerByIndex
+        self._fn_balance_of = functions.balanceOf
+        # multicall items which never change for this account
+        self._refund_eth_data = encode_call(functions.refundETH())
+        self._unwrap_weth9_data = encode_call(functions.unwrapWETH9(0, self.account.address))
+        # CollectParams collecting everything to this account, copied per call since recipient may change
+        self._collect_template = dict(
+            recipient=self.account.address,
+            amount0Max=MAX_ERC20_AMOUNT,
+            amount1Max=MAX_ERC20_AMOUNT
+        )
     
     def get_pool(self, token0: str, token1: str, fee: PoolFee) -> UniswapV3Pool:
         key = (token0, token1, fee)
         if (token0, token1, fee) in self.pool_contracts:
             pool = self.pool_contracts[key]
         else:
-            pool_addr = self.factory_contract.get_pool(token0, token1, fee)
+            # pool addresses never change once created, an empty address is not persisted
+            pool_addr = cached_lookup(
+                ("pool", self.chain_id(), token0.lower(), token1.lower(), fee.value),
+                lambda: self.factory_contract.get_pool(token0, token1, fee),
+                keep=lambda addr: addr != EMPTY_ADDRESS,
+            )
             pool = UniswapV3Pool(pool_addr,self.api, self.account)
             self.pool_contracts[key] = pool
         return pool
@@ -64,42 +178,46 @@ class NonfungiblePositionManager(BaseLocalContractAPI):
         if address in self.erc20_token_contracts:
             return self.erc20_token_contracts[address]
         else:
-            self.erc20_token_contracts[address] = ERC20Token(address, self.api, self.account)
+            self.erc20_token_contracts[address] = ERC20Token(address, self.api, self.account, self.chain_id())
             return self.erc20_token_contracts[address]
     
+    # WETH9() of the position manager is fixed per network, shared by all instances
+    _WETH9_BY_CHAIN: Dict[int, str] = {
+        1: "0xC02aaA39b223FE8D0A0e5C4F27eAD9083C756Cc2",
+        10: "0x4200000000000000000000000000000000000006",
+        137: "0x0d500B1d8E8eF31E21C99d1Db9A6444d3ADf1270",
+        42161: "0x82aF49447D8a07e3bd95BD0d56f35241523fBab1",
+    }
+
     def weth9(self):
         if not self._weth9:
-            self._weth9 = self.contract.functions.WETH9().call()
+            chain_id = self.chain_id()
+            if chain_id not in self._WETH9_BY_CHAIN:
+                self._WETH9_BY_CHAIN[chain_id] = self.contract.functions.WETH9().call()
+            self._weth9 = self._WETH9_BY_CHAIN[chain_id]
         return self._weth9
+
+    def weth9_bytes(self) -> bytes:
+        """20 bytes address of weth9(), compared against position tokens regardless of checksum case"""
+        if not self._weth9_bytes:
+            self._weth9_bytes = bytes(HexBytes(self.weth9()))
+        return self._weth9_bytes
             
-    POSITION_KEYS = (
-        "nonce",
-        "operator",
-        "token0",
-        "token1",
-        "fee",
-        "tickLower",
-        "tickUpper",
-        "liquidity",
-        "feeGrowthInside0LastX128",
-        "feeGrowthInside1LastX128",
-        "tokensOwed0",
-        "tokensOwed1"
-    )
-
-    def eth_owed_in_position(self, token_id: Optional[int]=None, position: Optional[dict]=None):
+    POSITION_KEYS = Position._fields
+
+    def eth_owed_in_position(self, token_id: Optional[int]=None, position: Union[Position, dict, None]=None):
         assert token_id or position, "At least one param should be parsed: token_id or position."
         if not position:
             position = self.positions(token_id)
         
-        weth9 = self.weth9()
-        for n in (0, 1):
-            if position[f"token{n}"] == weth9:
+        weth9 = self.weth9_bytes()
+        for n, token in enumerate(position_tokens(position)):
+            if bytes(HexBytes(token)) == weth9:
                 return True, n
 
         return False, -1
 
-    def positions(self, token_id: int) -> dict:
+    def positions(self, token_id: int) -> Position:
         """Get position infomation by position token id
 
         Solidity documentation: 
@@ -107,14 +225,49 @@ class NonfungiblePositionManager(BaseLocalContractAPI):
 
         :param token_id: The ID of the token that represents the position
         :type token_id: int
-        :return: position infomation
-        :rtype: dict
+        :return: position infomation, also indexable by the names in POSITION_KEYS
+        :rtype: Position
 
         """
-        r = self.contract.get_function_by_name("positions")(token_id).call()
-        return dict(zip(self.POSITION_KEYS, r))
+        return Position._make(self._fn_positions(token_id).call())
 
-    def collect(self, token_id: int, amount0Max: int=MAX_ERC20_AMOUNT, amount1Max: int=MAX_ERC20_AMOUNT, **trx_params) -> dict:
+    def positions_many(self, token_ids: List[int]) -> List[Position]:
+        """positions() of every token in token_ids, in one rpc round trip."""
+        if not token_ids:
+            return []
+        results = self.call_many(*(self._fn_positions(token_id) for token_id in token_ids))
+        return [Position._make(r) for r in results]
+
+    def call_many(self, *functions: ContractFunction, trx_params: Optional[dict]=None) -> list:
+        """Call several functions of this contract in one eth_call through its own multicall.
+
+        The periphery multicall delegatecalls itself, so msg.sender checks (collect,
+        decreaseLiquidity) pass just as with direct calls, which a Multicall3 aggregator would not.
+
+        :return: decoded results in the same order as functions
+        :rtype: list
+        """
+        results = self.multicall(*(encode_call(function) for function in functions)).call(trx_params)
+        return [decode_call_result(self.api, function, data) for function, data in zip(functions, results)]
+
+    def call_position_reads(self, collect: ContractFunction, token_id: int, trx_params: Optional[dict]=None) -> Tuple[list, Position]:
+        """collect.call(), positions(token_id) and WETH9() (unless cached) in one rpc round trip.
+
+        :return: Tuple[collectable amounts, position]
+        :rtype: Tuple[list, Position]
+        """
+        functions = [collect, self._fn_positions(token_id)]
+        if not self._weth9:
+            functions.append(self.contract.functions.WETH9())
+        results = self.call_many(*functions, trx_params=trx_params)
+        if not self._weth9:
+            self._weth9 = results[2]
+        return results[0], Position._make(results[1])
+
+    def collect(
+        self, token_id: int, amount0Max: int=MAX_ERC20_AMOUNT, amount1Max: int=MAX_ERC20_AMOUNT, 
+        position: Union[Position, dict, None]=None, **trx_params
+        ) -> dict:
         """Collect fees from position
 
         Solidity documentation: 
@@ -127,6 +280,8 @@ class NonfungiblePositionManager(BaseLocalContractAPI):
         :type amount0Max: int, optional
         :param amount1Max: max amount of token1 to collect, defaults to MAX_ERC20_AMOUNT
         :type amount1Max: int, optional
+        :param position: positions(token_id) if already known, only token0/token1 are used, defaults to None
+        :type position: Union[Position, dict, None], optional
         :return: transation data
         :rtype: dict
 
@@ -139,15 +294,21 @@ class NonfungiblePositionManager(BaseLocalContractAPI):
         CollectEventDict, see: https://docs.uniswap.org/protocol/reference/periphery/interfaces/INonfungiblePositionManager#collect-1
             
         """
-        collect_params = dict(
-            tokenId=token_id,
-            recipient=self.account.address,
-            amount0Max=int(amount0Max),
-            amount1Max=int(amount1Max)
-        )
+        if amount0Max == MAX_ERC20_AMOUNT and amount1Max == MAX_ERC20_AMOUNT:
+            collect_params = dict(self._collect_template, tokenId=token_id)
+        else:
+            collect_params = dict(
+                tokenId=token_id,
+                recipient=self.account.address,
+                amount0Max=int(amount0Max),
+                amount1Max=int(amount1Max)
+            )
 
-        collect = self.contract.functions.collect(collect_params)
-        amounts = collect.call(trx_params)
+        collect = self._fn_collect(collect_params)
+        if position is None:
+            amounts, position = self.call_position_reads(collect, token_id, trx_params)
+        else:
+            amounts = collect.call(trx_params)
         if (not amounts[0]) and (not amounts[1]):
             return {
                 "trx_sent": False,
@@ -155,15 +316,14 @@ class NonfungiblePositionManager(BaseLocalContractAPI):
                 "call_result": amounts 
             }
 
-        position = self.positions(token_id)
         is_eth, pos = self.eth_owed_in_position(position=position)
         if is_eth:
             erc20_pos = int(pos==0)
             collect_params["recipient"] = EMPTY_ADDRESS
             function = self.multicall(
-                self.contract.encodeABI("collect", args=[collect_params]),
-                self.contract.encodeABI("unwrapWETH9", args=[0, self.account.address]),
-                self.contract.encodeABI("sweepToken", args=[position[f"token{erc20_pos}"], amounts[erc20_pos], self.account.address])
+                encode_call(self._fn_collect(collect_params)),
+                self._unwrap_weth9_data,
+                encode_call(self._fn_sweep_token(position_tokens(position)[erc20_pos], amounts[erc20_pos], self.account.address))
             )
             call_before_transation = True
         else:
@@ -186,14 +346,13 @@ class NonfungiblePositionManager(BaseLocalContractAPI):
         position = self.positions(token_id)
         params = dict(
             tokenId=token_id,
-            liquidity=position["liquidity"],
+            liquidity=position.liquidity,
             amount0Min=0,
             amount1Min=0,
-            deadline=int(datetime.now().timestamp()+self.default_deadline)
+            deadline=int(time.time() + self.default_deadline)
         )
-        balance = self.contract.get_function_by_name("decreaseLiquidity")(params).call()
-        position["balance"] = balance
-        return position
+        balance = self._fn_decrease_liquidity(params).call()
+        return dict(position, balance=balance)
 
     def decreaseLiquidity(self, token_id: int, liquidity: Optional[int]=None, percentage: Optional[float]=1, **trx_params) -> dict:
         """DecreaseLiquidity from a position to self.account
@@ -216,55 +375,53 @@ class NonfungiblePositionManager(BaseLocalContractAPI):
         DecreaseLiquidityDict see: https://docs.uniswap.org/protocol/reference/periphery/interfaces/INonfungiblePositionManager#decreaseliquidity
         """
 
-        position = self.positions(token_id)
+        collect_params = dict(self._collect_template, tokenId=token_id)
+        collect = self._fn_collect(collect_params)
+        amounts, position = self.call_position_reads(collect, token_id, trx_params)
+
         if not liquidity:
-            liquidity = int(position["liquidity"] * percentage)
+            liquidity = int(position.liquidity * percentage)
         else:
-            liquidity = min(liquidity, position["liquidity"])
+            liquidity = min(liquidity, position.liquidity)
         params = dict(
             tokenId=token_id,
             liquidity=liquidity,
             amount0Min=0,
             amount1Min=0,
-            deadline=int(datetime.now().timestamp()+self.default_deadline)
+            deadline=int(time.time() + self.default_deadline)
         )
         if self.call_only:
-            return self.contract.get_function_by_name("decreaseLiquidity")(params).call()
-        collect_params = dict(
-            tokenId=token_id,
-            recipient=self.account.address,
-            amount0Max=MAX_ERC20_AMOUNT,
-            amount1Max=MAX_ERC20_AMOUNT
-        )
+            return self._fn_decrease_liquidity(params).call()
 
-        collect = self.contract.functions.collect(collect_params)
-        amounts = collect.call(trx_params)
-        
-        position = self.positions(token_id)
         is_eth, pos = self.eth_owed_in_position(position=position)
         if is_eth:
             erc20_pos = int(pos==0)
             collect_params["recipient"] = EMPTY_ADDRESS
             function = self.multicall(
-                self.contract.encodeABI("decreaseLiquidity", args=[params]),
-                self.contract.encodeABI("collect", args=[collect_params]),
-                self.contract.encodeABI("unwrapWETH9", args=[0, self.account.address]),
-                self.contract.encodeABI("sweepToken", args=[position[f"token{erc20_pos}"], amounts[erc20_pos], self.account.address])
+                encode_call(self._fn_decrease_liquidity(params)),
+                encode_call(self._fn_collect(collect_params)),
+                self._unwrap_weth9_data,
+                encode_call(self._fn_sweep_token(position_tokens(position)[erc20_pos], amounts[erc20_pos], self.account.address))
             )
         else:
             function = self.multicall(
-                self.contract.encodeABI("decreaseLiquidity", args=[params]),
-                self.contract.encodeABI("collect", args=[collect_params]),
+                encode_call(self._fn_decrease_liquidity(params)),
+                encode_call(self._fn_collect(collect_params)),
             )
 
+        # the DecreaseLiquidity and Collect events carry the amounts, no pre-flight eth_call
         result = self.transact_with_return(
             function, 
             trx_params,
             [self.contract.events.DecreaseLiquidity(), self.contract.events.Collect()],
+            call_before_transaction=False,
         )
         return result
 
-    def increaseLiquidity(self, token_id: int, amount0: int, amount1: int, min_pct: float=0, **trx_params) -> dict:
+    def increaseLiquidity(
+        self, token_id: int, amount0: int, amount1: int, min_pct: float=0, is_weth_side: Optional[int]=None,
+        **trx_params
+        ) -> dict:
         """IncreaseLiquidity to a position
 
         Solidity documentation: 
@@ -280,6 +437,9 @@ class NonfungiblePositionManager(BaseLocalContractAPI):
         :type amount1: int
         :param min_pct: [description], defaults to 0
         :type min_pct: float, optional
+        :param is_weth_side: 0 or 1 if token0 or token1 of the position is WETH9, -1 if neither,
+            looked up from the position when None, defaults to None
+        :type is_weth_side: Optional[int], optional
         :return: transation data
         :rtype: [type]
 
@@ -296,18 +456,21 @@ class NonfungiblePositionManager(BaseLocalContractAPI):
             amount1Desired=amount1,
             amount0Min=int(amount0*min_pct),
             amount1Min=int(amount1*min_pct),
-            deadline=int(datetime.now().timestamp() + 60)
+            deadline=int(time.time() + 60)
         )
-        is_eth, pos = self.eth_owed_in_position(token_id)
+        if is_weth_side is None:
+            is_eth, pos = self.eth_owed_in_position(token_id)
+        else:
+            is_eth, pos = is_weth_side >= 0, is_weth_side
 
         if is_eth:
             function = self.multicall(
-                self.contract.encodeABI("increaseLiquidity", [params]),
-                self.contract.encodeABI("refundETH")
+                encode_call(self._fn_increase_liquidity(params)),
+                self._refund_eth_data
             )
             trx_params["value"] = amount1 if pos else amount0
         else:
-            function = self.contract.get_function_by_name("increaseLiquidity")(params)
+            function = self._fn_increase_liquidity(params)
         
         if self.call_only:
             return {
@@ -315,7 +478,9 @@ class NonfungiblePositionManager(BaseLocalContractAPI):
                 "reason": "call only",
                 "call_result": function.call(trx_params)
             }
-        return self.transact_with_return(function, trx_params, [self.contract.events.IncreaseLiquidity()])
+        return self.transact_with_return(
+            function, trx_params, [self.contract.events.IncreaseLiquidity()], call_before_transaction=False
+        )
     
     def mint(
         self, token0: str, token1: str, amount0: int, amount1: int, tickLower: int, tickUpper: int, 
@@ -323,37 +488,39 @@ class NonfungiblePositionManager(BaseLocalContractAPI):
         **trx_params
         ):
 
+        # ticks must be multiples of the pool tick spacing, floor onto it (also for negative ticks)
+        spacing = fee.tick_spacing
         params = dict(
             token0=token0,
             token1=token1,
             fee=fee.value,
-            tickLower=int(tickLower-tickLower%60),
-            tickUpper=int(tickUpper-tickUpper%60),
+            tickLower=int(tickLower // spacing * spacing),
+            tickUpper=int(tickUpper // spacing * spacing),
             amount0Desired=amount0,
             amount1Desired=amount1,
             amount0Min=int(amount0*min_pct),
             amount1Min=int(amount1*min_pct),
             recipient=self.account.address,
-            deadline=int(datetime.now().timestamp() + self.default_deadline)
+            deadline=int(time.time() + self.default_deadline)
         )
 
         weth9 = self.weth9()
         if token0 == weth9:
             trx_params["value"] = amount0
             function = self.multicall(
-                self.contract.encodeABI("mint", args=[params]),
-                self.contract.encodeABI("refundETH"),
+                encode_call(self._fn_mint(params)),
+                self._refund_eth_data,
             )
         elif token1 == weth9:
             trx_params["value"] = amount1
             function = self.multicall(
-                self.contract.encodeABI("mint", args=[params]),
-                self.contract.encodeABI("refundETH"),
+                encode_call(self._fn_mint(params)),
+                self._refund_eth_data,
             )
         else:
-            function = self.contract.get_function_by_name("mint")(params)
+            function = self._fn_mint(params)
         if self.call_only:
-            result = self.contract.get_function_by_name("mint")(params).call(trx_params)
+            result = self._fn_mint(params).call(trx_params)
             return {
                 "trx_sent": False,
                 "reason": "call only",
@@ -366,14 +533,15 @@ class NonfungiblePositionManager(BaseLocalContractAPI):
                     self.contract.events.IncreaseLiquidity(),
                     self.contract.events.Transfer(),
 
-                ]
+                ],
+                call_before_transaction=False,
             )
     
     def get_pool_price(self, token0: str, token1: str, fee: PoolFee) -> float:
         pool = self.get_pool(token0, token1, fee)
         slot0 = pool.slot0()
         tick = slot0[1]
-        return math.pow(1.0001, tick)
+        return sqrt_price_at_tick(tick) ** 2
 
     def cal_increase_position(
         self, token0: Union[Tuple[str, int], str], token1: Union[Tuple[str, int], str],
@@ -440,24 +608,38 @@ class NonfungiblePositionManager(BaseLocalContractAPI):
 
         if isinstance(token0, tuple):
             token0, decimal0 = token0
+            erc20_token0 = None
         else:
-            decimal0 = self.get_erc20_token(token0).decimals()
+            erc20_token0 = self.get_erc20_token(token0)
 
         if isinstance(token1, tuple):
             token1, decimal1 = token1
+            erc20_token1 = None
         else:
-            decimal1 = self.get_erc20_token(token1).decimals()
-        
+            erc20_token1 = self.get_erc20_token(token1)
+
+        # unknown decimals and slot0 are independent reads, fetch them in one Multicall3 batch
+        missing = [token for token in (erc20_token0, erc20_token1) if token is not None and not token.has_decimals()]
+        functions = [token.contract.functions.decimals() for token in missing]
+        if not current_price:
+            functions.append(self.get_pool(token0, token1, fee).contract.functions.slot0())
+        results = self.multicall3.aggregate(functions)
+        for token, decimals in zip(missing, results):
+            token.set_decimals(decimals)
+        if erc20_token0 is not None:
+            decimal0 = erc20_token0.decimals()
+        if erc20_token1 is not None:
+            decimal1 = erc20_token1.decimals()
+
         price_multipiler = 10**(decimal1-decimal0)
         if current_price:
             if price_reverted:
                 current_price = 1 / current_price
             current_price = current_price * price_multipiler
         else:
-            pool = self.get_pool(token0, token1, fee)
-            slot0 = pool.slot0()
+            slot0 = results[-1]
             tick = slot0[1]
-            current_price = math.pow(1.0001, tick)
+            current_price = sqrt_price_at_tick(tick) ** 2
         
 
         if price_reverted:    
@@ -466,8 +648,8 @@ class NonfungiblePositionManager(BaseLocalContractAPI):
         low_price = low_price * price_multipiler
         high_price = high_price * price_multipiler
         
-        tickLower = int(math.log(low_price, 1.0001))
-        tickhigher = int(math.log(high_price, 1.0001))
+        tickLower = int(_price_to_tick_core(low_price))
+        tickhigher = int(_price_to_tick_core(high_price))
 
         if not amount1:
             # TODO: cal amount1
@@ -568,47 +750,40 @@ class NonfungiblePositionManager(BaseLocalContractAPI):
         :type amt1: int
         """
 
+        in_range = lower < cprice <= upper
         if cprice <= lower:
             assert amt0, f"When cprice({cprice}) <= lower({lower}), amt0 must bigger than 0"
-            return int(
-                amt0 * (math.sqrt(upper)*math.sqrt(lower)/(math.sqrt(upper)-math.sqrt(lower)))
-            ), amt0, 0
-        elif lower < cprice <= upper:
+        elif not in_range:
+            assert amt1, f"When upper({upper}) < cprice({cprice}), amt1 must bigger than 0"
+        else:
+            assert amt0 or amt1 is not None, "amt0 or amt1 must be given"
+
+        liquidity, amount = _cal_liquidity_core(
+            float(cprice), float(upper), float(lower), float(amt0 or 0), float(amt1 or 0)
+        )
+        if cprice <= lower:
+            return int(liquidity), amt0, 0
+        elif in_range:
             if amt0:
-                
-                liquidity = int(
-                    amt0 * (math.sqrt(upper) * math.sqrt(cprice)) / (math.sqrt(upper) - math.sqrt(cprice))
-                )
-                amt1 = int(
-                    liquidity * (math.sqrt(cprice) - math.sqrt(lower))
-                )
-                return liquidity, amt0, amt1
+                return int(liquidity), amt0, int(amount)
             else:
-                liquidity = int(
-                    amt1 / (math.sqrt(cprice) - math.sqrt(lower))
-                )
-                amt0 = int(
-                    liquidity * (math.sqrt(upper) - math.sqrt(cprice)) / (math.sqrt(upper) * math.sqrt(cprice))
-                )
-                return liquidity, amt0, amt1
+                return int(liquidity), int(amount), amt1
         else:
-            assert amt1, f"When upper({upper}) < cprice({cprice}), amt1 must bigger than 0"
-            return int(
-                amt1 / (math.sqrt(upper) - math.sqrt(lower))
-            ), 0, amt1
+            return int(liquidity), 0, amt1
 
     def multicall(self, *encodedABI):
-        data = [bytes.fromhex(hexstr[2:]) for hexstr in encodedABI]
-        return self.contract.get_function_by_name("multicall")(data)
+        # encode_call already returns HexBytes, only hex strings need decoding
+        data = [encoded if isinstance(encoded, bytes) else HexBytes(encoded) for encoded in encodedABI]
+        return self._fn_multicall(data)
 
     def nft_token(self, index: int=0):
-        return self.contract.get_function_by_name("tokenOfOwnerByIndex")(
+        return self._fn_token_of_owner_by_index(
             self.account.address,
             index
         ).call()
 
     def nft_balance(self):
-        return self.contract.get_function_by_name("balanceOf")(self.account.address).call()
+        return self._fn_balance_of(self.account.address).call()
     
     def nft_tokens(self) -> list:
         """Get nft tokens owned by this account
@@ -617,10 +792,25 @@ class NonfungiblePositionManager(BaseLocalContractAPI):
         :rtype: list
         """
         balance = self.nft_balance()
-        token_ids = []
-        for i in range(balance):
-            token_ids.append(self.nft_token(i))
-        return token_ids
+        if not balance:
+            return []
+        return self.call_many(
+            *(self._fn_token_of_owner_by_index(self.account.address, i) for i in range(balance))
+        )
+
+    def collect_all(self, **trx_params) -> Dict[int, dict]:
+        """Collect fees from every position owned by this account.
+
+        Positions are read in one batch and handed to collect, so each collect costs a single call.
+
+        :return: {token_id: transation data of collect}
+        :rtype: Dict[int, dict]
+        """
+        token_ids = self.nft_tokens()
+        return {
+            token_id: self.collect(token_id, position=position, **trx_params)
+            for token_id, position in zip(token_ids, self.positions_many(token_ids))
+        }
 
     def burn(self, token_id: int, **trx_params):
         function = self.contract.functions.burn(token_id)
@@ -0,0 +1,41 @@
+"""Web3 connections reusing their transport between requests."""
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from web3 import Web3
+
+
+def http_session(pool_size: int=32, retries: int=3) -> requests.Session:
+    """Session keeping up to pool_size connections alive, retrying failed connects with backoff.
+
+    Only connection errors are retried: rpc requests are POSTs, and one that timed out while
+    reading may have reached the node already (e.g. eth_sendRawTransaction).
+    """
+    session = requests.Session()
+    adapter = HTTPAdapter(
+        pool_connections=pool_size,
+        pool_maxsize=pool_size,
+        max_retries=Retry(total=retries, connect=retries, read=0, other=0, backoff_factor=0.1, allowed_methods=None),
+    )
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+def connect(uri: str, pool_size: int=32, timeout: float=30) -> Web3:
+    """Web3 for uri, by scheme: ws(s):// websocket, http(s):// pooled keep-alive session, else an IPC path.
+
+    :param uri: rpc endpoint or path of the node ipc socket
+    :type uri: str
+    :param pool_size: kept alive http connections, defaults to 32
+    :type pool_size: int, optional
+    :param timeout: request timeout in seconds, defaults to 30
+    :type timeout: float, optional
+    """
+    if uri.startswith(("ws://", "wss://")):
+        provider = Web3.WebsocketProvider(uri, websocket_timeout=timeout)
+    elif uri.startswith(("http://", "https://")):
+        provider = Web3.HTTPProvider(uri, request_kwargs={"timeout": timeout}, session=http_session(pool_size))
+    else:
+        provider = Web3.IPCProvider(uri, timeout=timeout)
+    return Web3(provider)